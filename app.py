@@ -7,18 +7,37 @@ if sys.platform == 'win32':
     asyncio.set_event_loop_policy(asyncio.WindowsProactorEventLoopPolicy())
 
 import os
+import gzip
 import json
 import time
+import hashlib
+from contextlib import asynccontextmanager
 
 from typing import List
-from fastapi import FastAPI, Body, Request, Query
-from fastapi.responses import HTMLResponse
+from fastapi import FastAPI, Body, Request, Query, Response, HTTPException
+from fastapi.responses import HTMLResponse, PlainTextResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
-from scraper import scrape_airport_weather
-from database import save_weather_snapshot, get_all_snapshots, get_snapshot_data, get_airport_history
+from scraper import scrape_weather_and_forecasts, scrape_airport_forecast, scrape_special_reports
+from browser_pool import close_browser_pool
+from http_scraper import close_http_client, ICAO_RE
+from metrics import metrics
+from weather_events import weather_events
+from keyed_cache import AsyncKeyedCache
+from shared_cache import make_cache_store
+from latest_db import open_latest_db
+from history_export import export_history, EXPORT_FORMATS
+from database import (
+    save_weather_snapshot, get_all_snapshots, get_snapshot_data, get_airport_history,
+    snapshot_cursor, history_cursor, run_retention, get_history_stats, DATABASE_PATH,
+)
 import logging
 
+try:
+    import brotli
+except ImportError:  # brotli 미설치 시 gzip만 제공
+    brotli = None
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -36,6 +55,9 @@ app = FastAPI()
 # Shared (server-side) weather cache
 # -----------------------------------------------------------------------------
 WEATHER_CACHE_TTL_SECONDS = 10 * 60
+# 신선 구간(TTL)이 지나도 이 시간 전까지는 이전 값을 즉시 응답하고 백그라운드에서 갱신 (stale-while-revalidate)
+# 이보다 오래된 값은 갱신을 기다린 뒤 응답합니다(갱신 실패 시에만 오류와 함께 이전 값 응답)
+WEATHER_CACHE_HARD_EXPIRY_SECONDS = int(os.getenv("WEATHER_CACHE_HARD_EXPIRY_SECONDS", str(2 * 60 * 60)))
 AUTO_REFRESH_ENABLED = os.getenv("AUTO_REFRESH_ENABLED", "1") not in ("0", "false", "False")
 AUTO_REFRESH_INTERVAL_SECONDS = int(os.getenv("AUTO_REFRESH_INTERVAL_SECONDS", str(WEATHER_CACHE_TTL_SECONDS)))
 _weather_cache_lock = asyncio.Lock()
@@ -43,25 +65,281 @@ _weather_cache = {
     "fetched_at": 0.0,          # monotonic-ish epoch seconds
     "last_updated": None,       # ISO string
     "data": None,               # scraped list
+    "last_error": None,         # 마지막 갱신 실패 메시지
+    "encoded": None,            # 갱신 시 미리 만든 응답 바이트/압축본/ETag (_encode_weather_payload)
 }
+_weather_refresh_task = None    # 진행 중인 갱신 (싱글 플라이트)
+
+# 캐시 저장소 (WEATHER_CACHE_BACKEND=memory|sqlite). _weather_cache는 이 프로세스가 마지막으로 읽은 사본
+# sqlite면 여러 워커가 같은 파일을 공유하고, 갱신 임대를 잡은 워커 1개만 스크래핑합니다
+WEATHER_REFRESH_LEASE_SECONDS = int(os.getenv("WEATHER_REFRESH_LEASE_SECONDS", "300"))
+# 공유 저장소 변경 여부(version)를 확인하는 최소 간격
+WEATHER_CACHE_SYNC_INTERVAL_SECONDS = float(os.getenv("WEATHER_CACHE_SYNC_INTERVAL_SECONDS", "1"))
+_cache_store = make_cache_store()
+_cache_version = 0
+_last_sync_check = 0.0
+_lease_owner = f"pid-{os.getpid()}"
+
+# 데이터 출처: scrape(이 프로세스에서 스크래핑) | db(cron이 저장한 weather_latest/airport_forecast_3day를 읽기만 함)
+# db 모드에서는 웹 프로세스가 Chromium을 띄우지 않습니다. 연결 정보는 DATABASE_URL (latest_db.py 참고)
+WEATHER_SOURCE = os.getenv("WEATHER_SOURCE", "scrape")
+# db 모드에서 weather_latest.updated_at 변경을 확인하는 간격
+LATEST_DB_POLL_SECONDS = float(os.getenv("LATEST_DB_POLL_SECONDS", "5"))
+_latest_db = None
+_last_db_check = 0.0
+
+# 상세 예보(ICAO별) / 특보 캐시. 예보는 기상 캐시 갱신 때 함께 수집된 값으로 미리 채워짐
+FORECAST_CACHE_TTL_SECONDS = int(os.getenv("FORECAST_CACHE_TTL_SECONDS", str(30 * 60)))
+FORECAST_CACHE_MAX_ENTRIES = int(os.getenv("FORECAST_CACHE_MAX_ENTRIES", "64"))
+SPECIAL_REPORT_CACHE_TTL_SECONDS = int(os.getenv("SPECIAL_REPORT_CACHE_TTL_SECONDS", str(WEATHER_CACHE_TTL_SECONDS)))
+_forecast_cache = AsyncKeyedCache("forecast", FORECAST_CACHE_TTL_SECONDS, FORECAST_CACHE_MAX_ENTRIES)
+_special_report_cache = AsyncKeyedCache("special_reports", SPECIAL_REPORT_CACHE_TTL_SECONDS, max_entries=1)
+
+metrics.describe("weather_cache_requests_total", "/api/weather cache lookups by result (hit/stale/expired/miss)")
+metrics.describe("weather_refresh_seconds", "Duration of weather cache refreshes (scrape)")
+metrics.describe("weather_refresh_failures_total", "Weather cache refreshes that raised or returned no data")
+metrics.describe("weather_refresh_lease_waits_total", "Refreshes that waited for another worker holding the refresh lease")
+metrics.describe("weather_cache_lock_wait_seconds", "Time spent waiting to acquire _weather_cache_lock")
+metrics.describe("http_request_seconds", "Request latency by route template")
+metrics.describe("history_db_query_seconds", "History SQLite query time")
 
-async def _refresh_weather_cache() -> bool:
+# /api/history/* 페이지 크기 (limit 미지정 시 기본값, 최대값)
+HISTORY_PAGE_LIMIT = int(os.getenv("HISTORY_PAGE_LIMIT", "200"))
+HISTORY_MAX_LIMIT = int(os.getenv("HISTORY_MAX_LIMIT", "1000"))
+# 히스토리 보존 정책(retention.py) 실행 주기. 0이면 서버에서 실행하지 않음 (cron 등으로 python retention.py)
+HISTORY_RETENTION_INTERVAL_HOURS = float(os.getenv("HISTORY_RETENTION_INTERVAL_HOURS", "0"))
+
+@asynccontextmanager
+async def _cache_lock(where: str):
+    """_weather_cache_lock 획득 대기 시간을 기록하며 잠급니다."""
+    started = time.perf_counter()
+    async with _weather_cache_lock:
+        metrics.observe("weather_cache_lock_wait_seconds", time.perf_counter() - started, where=where)
+        yield
+
+def _encode_weather_payload(data, last_updated: str) -> dict:
     """
-    캐시를 실제로 갱신 시도합니다(싱글 플라이트).
-    성공하면 True, 실패하면 False.
+    /api/weather 캐시 응답을 갱신 시 1회만 직렬화/압축해 둡니다.
+    반환: {"etag": '"..."', "variants": {"identity": bytes, "gzip": bytes, "br": bytes}}
     """
-    now = time.time()
-    async with _weather_cache_lock:
-        try:
-            data = await scrape_airport_weather()
-            _weather_cache["data"] = data
-            _weather_cache["fetched_at"] = now
-            _weather_cache["last_updated"] = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(now))
-            logger.info("Weather cache refreshed (items=%s)", len(data) if data else 0)
+    body = json.dumps(
+        {"data": data, "error": None, "cached": True, "last_updated": last_updated},
+        ensure_ascii=False, separators=(",", ":"),
+    ).encode("utf-8")
+    variants = {"identity": body, "gzip": gzip.compress(body, compresslevel=6)}
+    if brotli is not None:
+        variants["br"] = brotli.compress(body, quality=5)
+    return {"etag": '"' + hashlib.sha256(body).hexdigest()[:32] + '"', "variants": variants}
+
+def _accepted_encodings(header: str) -> set:
+    """Accept-Encoding 헤더에서 q=0 이 아닌 인코딩 목록"""
+    accepted = set()
+    for part in (header or "").split(","):
+        token, _, params = part.strip().partition(";")
+        q = params.strip()
+        if q.startswith("q="):
+            try:
+                if float(q[2:]) == 0:
+                    continue
+            except ValueError:
+                continue
+        if token:
+            accepted.add(token.strip().lower())
+    return accepted
+
+def _encoded_weather_response(request: Request, encoded: dict, status: str, age) -> Response:
+    """미리 만든 바이트로 응답. If-None-Match 가 ETag와 같으면 304."""
+    etag = encoded["etag"]
+    headers = {
+        "ETag": etag,
+        "Vary": "Accept-Encoding",
+        "X-Cache-Status": status,
+        "Age": str(max(int(age or 0), 0)),
+    }
+    if_none_match = request.headers.get("if-none-match", "")
+    if if_none_match.strip() == "*" or etag in (t.strip() for t in if_none_match.split(",")):
+        return Response(status_code=304, headers=headers)
+
+    accepted = _accepted_encodings(request.headers.get("accept-encoding", ""))
+    variants = encoded["variants"]
+    for encoding in ("br", "gzip"):
+        if encoding in variants and encoding in accepted:
+            headers["Content-Encoding"] = encoding
+            return Response(content=variants[encoding], media_type="application/json", headers=headers)
+    return Response(content=variants["identity"], media_type="application/json", headers=headers)
+
+async def _store_call(fn, *args):
+    """저장소 메서드 호출. 공유(SQLite) 저장소는 이벤트 루프를 막지 않도록 executor에서 실행."""
+    if not _cache_store.shared:
+        return fn(*args)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, fn, *args)
+
+async def _apply_weather_entry(entry: dict, version: int):
+    """저장소 항목을 이 프로세스의 _weather_cache에 반영합니다 (SSE 발행, 예보 캐시 채움 포함)."""
+    global _cache_version
+    fetched_at = float(entry.get("fetched_at") or 0.0)
+    async with _cache_lock("sync"):
+        changed = fetched_at != float(_weather_cache.get("fetched_at") or 0.0)
+        if entry.get("data"):
+            _weather_cache["data"] = entry["data"]
+            _weather_cache["fetched_at"] = fetched_at
+            _weather_cache["last_updated"] = entry.get("last_updated")
+            _weather_cache["encoded"] = entry.get("encoded")
+        _weather_cache["last_error"] = entry.get("last_error")
+        _cache_version = version
+        if changed and entry.get("data"):
+            weather_events.publish(entry["data"], entry.get("last_updated"))
+    if changed:
+        # 같은 수집에서 받은 3일 예보로 예보 캐시를 미리 채움 (예보 패널 첫 요청도 캐시 히트)
+        for icao, days in (entry.get("forecasts") or {}).items():
+            if days:
+                _forecast_cache.put(icao, days, fetched_at)
+
+async def _sync_weather_cache(force: bool = False):
+    """공유 저장소가 바뀌었으면(version 비교) 읽어 옵니다. memory 저장소는 항상 최신이라 생략."""
+    global _last_sync_check
+    if not _cache_store.shared:
+        return
+    now = time.monotonic()
+    if not force and now - _last_sync_check < WEATHER_CACHE_SYNC_INTERVAL_SECONDS:
+        return
+    _last_sync_check = now
+    version = await _store_call(_cache_store.version)
+    if version == _cache_version:
+        return
+    entry = await _store_call(_cache_store.load)
+    if entry:
+        await _apply_weather_entry(entry, version)
+
+async def _wait_for_peer_refresh() -> bool:
+    """다른 워커가 임대를 잡고 수집 중이면, 결과가 저장되거나 임대가 끝날 때까지 기다렸다가 읽습니다."""
+    started_version = await _store_call(_cache_store.version)
+    while True:
+        await asyncio.sleep(WEATHER_CACHE_SYNC_INTERVAL_SECONDS)
+        if await _store_call(_cache_store.version) != started_version:
+            break
+        if await _store_call(_cache_store.lease_expires_at) < time.time():
+            break
+    await _sync_weather_cache(force=True)
+    return bool(_weather_cache.get("data")) and _weather_cache.get("last_error") is None
+
+async def _refresh_weather_cache(trigger: str = "background") -> bool:
+    """
+    캐시를 실제로 갱신 시도합니다. 성공하면 True, 실패하면 False.
+    공유 저장소에서는 갱신 임대를 잡은 워커만 스크래핑하고, 나머지 워커는 그 결과를 기다립니다.
+    직접 부르지 말고 _start_weather_refresh()를 통해 싱글 플라이트로 실행하세요.
+    """
+    if not await _store_call(_cache_store.acquire_lease, _lease_owner, WEATHER_REFRESH_LEASE_SECONDS):
+        metrics.inc("weather_refresh_lease_waits_total", trigger=trigger)
+        return await _wait_for_peer_refresh()
+    try:
+        # 임대를 잡기 직전에 다른 워커가 갱신을 마쳤으면 다시 수집하지 않음
+        await _sync_weather_cache(force=True)
+        if _cache_store.shared and time.time() - float(_weather_cache.get("fetched_at") or 0.0) < WEATHER_CACHE_TTL_SECONDS:
             return True
-        except Exception:
-            logger.exception("Weather cache refresh failed")
-            return False
+        return await _scrape_into_cache(trigger)
+    finally:
+        await _store_call(_cache_store.release_lease, _lease_owner)
+
+async def _scrape_into_cache(trigger: str) -> bool:
+    """
+    스크래핑은 잠금 밖에서 하고, 결과 반영만 잠금 안에서 합니다.
+    빈 결과는 실패로 보고 이전 캐시를 유지합니다.
+    """
+    try:
+        with metrics.span("weather_refresh", trigger=trigger):
+            data, forecast_map = await scrape_weather_and_forecasts()
+        if not data:
+            raise RuntimeError("스크래핑 결과가 비어 있습니다")
+    except Exception as e:
+        logger.exception("Weather cache refresh failed")
+        metrics.inc("weather_refresh_failures_total", trigger=trigger)
+        await _store_call(_cache_store.save_error, str(e))
+        async with _cache_lock("refresh"):
+            _weather_cache["last_error"] = str(e)
+        return False
+
+    now = time.time()
+    last_updated = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(now))
+    entry = {
+        "fetched_at": now,
+        "last_updated": last_updated,
+        "data": data,
+        "forecasts": forecast_map,
+        "last_error": None,
+        "encoded": _encode_weather_payload(data, last_updated),
+    }
+    version = await _store_call(_cache_store.save, entry)
+    await _apply_weather_entry(entry, version)
+    logger.info("Weather cache refreshed (items=%s, trigger=%s)", len(data), trigger)
+    return True
+
+async def _db_call(fn, *args):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, fn, *args)
+
+async def _sync_from_db(force: bool = False):
+    """
+    db 모드: weather_latest.updated_at만 먼저 확인하고, 바뀌었을 때만 본문/예보를 읽어 캐시에 반영합니다.
+    (SSE 발행, 예보·특보 캐시 채움 포함)
+    """
+    global _last_db_check
+    now = time.monotonic()
+    if not force and now - _last_db_check < LATEST_DB_POLL_SECONDS:
+        return
+    _last_db_check = now
+    try:
+        updated_at = await _db_call(_latest_db.updated_at)
+        if updated_at is None or updated_at == float(_weather_cache.get("fetched_at") or 0.0):
+            return
+        with metrics.span("latest_db_load"):
+            latest = await _db_call(_latest_db.load_latest)
+            if latest is None:  # updated_at 확인과 본문 조회 사이에 행이 지워짐
+                return
+            forecasts = await _db_call(_latest_db.load_forecasts)
+        data, special_reports, updated_at = latest
+    except Exception as e:
+        logger.exception("Latest DB read failed")
+        async with _cache_lock("db_sync"):
+            _weather_cache["last_error"] = str(e)
+        return
+
+    last_updated = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(updated_at))
+    await _apply_weather_entry({
+        "fetched_at": updated_at,
+        "last_updated": last_updated,
+        "data": data,
+        "forecasts": forecasts,
+        "last_error": None,
+        "encoded": _encode_weather_payload(data, last_updated) if data else None,
+    }, _cache_version)
+    _special_report_cache.put("all", special_reports)
+    logger.info("Loaded latest snapshot from DB (items=%s, updated_at=%s)", len(data), last_updated)
+
+async def _db_poll_loop():
+    """db 모드 백그라운드: cron이 새 데이터를 쓰면 곧바로 캐시/SSE에 반영"""
+    while True:
+        await _sync_from_db(force=True)
+        await asyncio.sleep(LATEST_DB_POLL_SECONDS)
+
+def _forecast_loader(icao: str):
+    if WEATHER_SOURCE == "db":
+        return _db_call(_latest_db.load_forecast, icao)
+    return scrape_airport_forecast(icao)
+
+async def _special_reports_loader():
+    if WEATHER_SOURCE == "db":
+        latest = await _db_call(_latest_db.load_latest)
+        return latest[1] if latest else []
+    return await scrape_special_reports()
+
+def _start_weather_refresh(trigger: str) -> asyncio.Task:
+    """진행 중인 갱신이 있으면 그 task를, 없으면 새로 시작한 task를 돌려줍니다(싱글 플라이트)."""
+    global _weather_refresh_task
+    if _weather_refresh_task is None or _weather_refresh_task.done():
+        _weather_refresh_task = asyncio.create_task(_refresh_weather_cache(trigger))
+    return _weather_refresh_task
 
 async def _auto_refresh_loop():
     """
@@ -71,38 +349,80 @@ async def _auto_refresh_loop():
     """
     # startup 직후 1회 워밍업(요청 전 최신값 준비)
     await asyncio.sleep(1)
-    await _refresh_weather_cache()
+    await asyncio.shield(_start_weather_refresh("background"))
+    await _special_report_cache.get("all", _special_reports_loader)
 
     while True:
         await asyncio.sleep(AUTO_REFRESH_INTERVAL_SECONDS)
         # TTL 기반으로만 갱신(불필요한 스크래핑 방지)
+        await _sync_weather_cache(force=True)
         now = time.time()
-        async with _weather_cache_lock:
+        async with _cache_lock("auto_refresh"):
             fetched_at = float(_weather_cache.get("fetched_at") or 0.0)
             age = (now - fetched_at) if fetched_at else None
             should_refresh = (age is None) or (age >= WEATHER_CACHE_TTL_SECONDS)
 
         if should_refresh:
-            await _refresh_weather_cache()
+            await asyncio.shield(_start_weather_refresh("background"))
+        # 특보도 만료됐으면 미리 갱신
+        await _special_report_cache.get("all", _special_reports_loader)
+
+async def _retention_loop():
+    while True:
+        try:
+            summary = await run_retention()
+            logger.info("History retention applied: %s", summary)
+        except Exception:
+            logger.exception("History retention failed")
+        await asyncio.sleep(HISTORY_RETENTION_INTERVAL_HOURS * 3600)
 
 @app.on_event("startup")
 async def _startup():
-    if AUTO_REFRESH_ENABLED:
+    global _latest_db
+    if WEATHER_SOURCE == "db":
+        _latest_db = open_latest_db()
+        app.state.weather_refresh_task = asyncio.create_task(_db_poll_loop())
+        logger.info("Serving weather from DB (poll=%ss)", LATEST_DB_POLL_SECONDS)
+    elif AUTO_REFRESH_ENABLED:
         # background task 등록
         app.state.weather_refresh_task = asyncio.create_task(_auto_refresh_loop())
         logger.info("Auto refresh enabled (interval=%ss, ttl=%ss)", AUTO_REFRESH_INTERVAL_SECONDS, WEATHER_CACHE_TTL_SECONDS)
     else:
         logger.info("Auto refresh disabled")
+    if HISTORY_RETENTION_INTERVAL_HOURS > 0:
+        app.state.retention_task = asyncio.create_task(_retention_loop())
 
 @app.on_event("shutdown")
 async def _shutdown():
-    task = getattr(app.state, "weather_refresh_task", None)
-    if task:
-        task.cancel()
-        try:
-            await task
-        except Exception:
-            pass
+    for task in (getattr(app.state, "weather_refresh_task", None), _weather_refresh_task,
+                 getattr(app.state, "retention_task", None)):
+        if task:
+            task.cancel()
+            try:
+                await task
+            except (asyncio.CancelledError, Exception):
+                pass
+    _forecast_cache.cancel_all()
+    _special_report_cache.cancel_all()
+    if _latest_db is not None:
+        _latest_db.close()
+    await close_browser_pool()
+    await close_http_client()
+
+@app.middleware("http")
+async def _record_request_latency(request: Request, call_next):
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        metrics.observe(
+            "http_request_seconds", time.perf_counter() - started,
+            route=getattr(route, "path", "unmatched"), method=request.method, status=status,
+        )
 
 # CORS 설정 (개발 환경용)
 app.add_middleware(
@@ -111,6 +431,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 # Mount static files from dist directory
@@ -134,65 +455,142 @@ async def read_data_view():
             return f.read()
     return HTMLResponse(content="Data view not found.", status_code=404)
 
+@app.get("/metrics")
+async def get_metrics():
+    """Prometheus text format snapshot"""
+    return PlainTextResponse(metrics.prometheus_text(), media_type="text/plain; version=0.0.4")
+
+def _set_cache_headers(response: Response, status: str, age):
+    response.headers["X-Cache-Status"] = status
+    response.headers["Age"] = str(max(int(age or 0), 0))
+
 @app.get("/api/weather")
-async def get_weather(force: bool = Query(False)):
+async def get_weather(request: Request, response: Response, force: bool = Query(False)):
     """
-    공용 캐시 기반 기상 데이터.
-    - 기본: 캐시가 10분 이내면 캐시 반환
-    - force=true: 캐시가 10분 이내면 갱신 거부(캐시 반환), 10분이 지났으면 갱신 시도
+    공용 캐시 기반 기상 데이터 (stale-while-revalidate).
+    - 10분 이내(fresh): 캐시 반환
+    - 10분 ~ 만료(stale): 캐시를 즉시 반환하고 백그라운드에서 1회 갱신
+    - 만료(expired) 또는 캐시 없음(miss): 진행 중인(또는 새) 갱신을 기다린 뒤 반환
+    - force=true: 캐시가 10분 이내면 갱신 거부(캐시 반환), 10분이 지났으면 갱신을 기다림
+    - WEATHER_SOURCE=db: cron이 DB에 저장한 최신 행을 응답 (force 무시)
+    응답 헤더: X-Cache-Status(HIT/STALE/EXPIRED/MISS), Age(초)
+    캐시 응답은 갱신 시 만들어 둔 바이트(gzip/br 포함)를 그대로 보내고, ETag가 같으면 304를 돌려줍니다.
     """
+    if WEATHER_SOURCE == "db":
+        return await _get_weather_from_db(request, response)
+    await _sync_weather_cache()
     now = time.time()
 
-    async with _weather_cache_lock:
+    async with _cache_lock("get_weather"):
         cached_data = _weather_cache.get("data")
         fetched_at = float(_weather_cache.get("fetched_at") or 0.0)
         last_updated = _weather_cache.get("last_updated")
-        age = now - fetched_at if fetched_at else None
-
-        cache_fresh = bool(cached_data) and age is not None and age < WEATHER_CACHE_TTL_SECONDS
-
-        # If cache is fresh, return it (even if force requested; we enforce 10-min refresh rule)
-        if cache_fresh:
-            if force:
-                wait_sec = int(WEATHER_CACHE_TTL_SECONDS - age)
-                return {
-                    "data": cached_data,
-                    "error": f"갱신은 10분마다 가능합니다. 약 {max(wait_sec, 0)}초 후 다시 시도하세요.",
-                    "cached": True,
-                    "last_updated": last_updated,
-                }
-            return {"data": cached_data, "error": None, "cached": True, "last_updated": last_updated}
-
-        # Otherwise, attempt refresh (single-flight under lock)
-        try:
-            data = await scrape_airport_weather()
-            _weather_cache["data"] = data
-            _weather_cache["fetched_at"] = now
-            _weather_cache["last_updated"] = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(now))
-            return {"data": data, "error": None, "cached": False, "last_updated": _weather_cache["last_updated"]}
-        except Exception as e:
-            logger.exception("기상 데이터 수집 실패")
-            # Fallback to previous cache if exists
-            if cached_data:
-                return {
-                    "data": cached_data,
-                    "error": f"갱신 실패로 이전 데이터를 표시합니다: {str(e)}",
-                    "cached": True,
-                    "last_updated": last_updated,
-                }
-            return {"data": [], "error": str(e), "cached": False, "last_updated": None}
+        encoded = _weather_cache.get("encoded")
+    age = now - fetched_at if (cached_data and fetched_at) else None
+
+    if age is None:
+        state = "miss"
+    elif age < WEATHER_CACHE_TTL_SECONDS:
+        state = "hit"
+    elif age < WEATHER_CACHE_HARD_EXPIRY_SECONDS:
+        state = "stale"
+    else:
+        state = "expired"
+    metrics.inc("weather_cache_requests_total", result=state)
+
+    # If cache is fresh, return it (even if force requested; we enforce 10-min refresh rule)
+    if state == "hit":
+        _set_cache_headers(response, "HIT", age)
+        if force:
+            wait_sec = int(WEATHER_CACHE_TTL_SECONDS - age)
+            return {
+                "data": cached_data,
+                "error": f"갱신은 10분마다 가능합니다. 약 {max(wait_sec, 0)}초 후 다시 시도하세요.",
+                "cached": True,
+                "last_updated": last_updated,
+            }
+        if encoded:
+            return _encoded_weather_response(request, encoded, "HIT", age)
+        return {"data": cached_data, "error": None, "cached": True, "last_updated": last_updated}
+
+    # Stale: serve immediately, refresh in the background (single-flight)
+    if state == "stale" and not force:
+        _start_weather_refresh("stale")
+        if encoded:
+            return _encoded_weather_response(request, encoded, "STALE", age)
+        _set_cache_headers(response, "STALE", age)
+        return {"data": cached_data, "error": None, "cached": True, "last_updated": last_updated}
+
+    # Miss / expired / forced: wait for the shared in-flight refresh
+    ok = await asyncio.shield(_start_weather_refresh("request"))
+    async with _cache_lock("get_weather"):
+        data = _weather_cache.get("data")
+        fetched_at = float(_weather_cache.get("fetched_at") or 0.0)
+        last_updated = _weather_cache.get("last_updated")
+        last_error = _weather_cache.get("last_error")
+
+    if ok:
+        _set_cache_headers(response, "MISS", time.time() - fetched_at)
+        return {"data": data, "error": None, "cached": False, "last_updated": last_updated}
+
+    # Fallback to previous cache if exists
+    if cached_data:
+        _set_cache_headers(response, state.upper(), time.time() - fetched_at)
+        return {
+            "data": cached_data,
+            "error": f"갱신 실패로 이전 데이터를 표시합니다: {last_error}",
+            "cached": True,
+            "last_updated": last_updated,
+        }
+    _set_cache_headers(response, "MISS", 0)
+    return {"data": [], "error": last_error, "cached": False, "last_updated": None}
+
+async def _get_weather_from_db(request: Request, response: Response):
+    """db 모드: 갱신은 cron이 하므로 TTL/force 없이 마지막으로 읽은 최신 행을 응답"""
+    await _sync_from_db()
+    async with _cache_lock("get_weather"):
+        fetched_at = float(_weather_cache.get("fetched_at") or 0.0)
+        encoded = _weather_cache.get("encoded")
+        last_error = _weather_cache.get("last_error")
+    metrics.inc("weather_cache_requests_total", result="db")
+    if encoded:
+        return _encoded_weather_response(request, encoded, "HIT", time.time() - fetched_at)
+    _set_cache_headers(response, "MISS", 0)
+    return {"data": [], "error": last_error or "No data", "cached": False, "last_updated": None}
+
+@app.get("/api/weather/stream")
+async def stream_weather(request: Request, last_event_id: str = Query(None)):
+    """
+    기상 데이터 변경 푸시 (Server-Sent Events).
+    접속 시 snapshot 이벤트, 이후 갱신마다 바뀐 공항만 delta 이벤트, 주기적 heartbeat.
+    재접속 시 Last-Event-ID 헤더(또는 last_event_id 쿼리) 이후 이벤트만 재전송합니다.
+    """
+    resume_from = request.headers.get("last-event-id") or last_event_id
+    return StreamingResponse(
+        weather_events.subscribe(resume_from),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+def _is_known_airport(icao: str) -> bool:
+    """ICAO 형식이고, 현재 관측 데이터가 있으면 그 공항 목록에 있는지 (잘못된 코드로 수집/캐시 자리 낭비 방지)"""
+    if not ICAO_RE.match(icao):
+        return False
+    data = _weather_cache.get("data")
+    return not data or any(item.get("code") == icao for item in data)
 
 @app.get("/api/forecast/{icao_code}")
 async def get_forecast(icao_code: str):
-    from scraper import scrape_airport_forecast
-    data = await scrape_airport_forecast(icao_code)
-    return data
+    """ICAO별 3일 예보 (캐시, 동시 요청은 수집 1회 공유)"""
+    icao_code = icao_code.upper()
+    if not _is_known_airport(icao_code):
+        raise HTTPException(status_code=404, detail=f"unknown airport: {icao_code}")
+    return await _forecast_cache.get(icao_code, lambda: _forecast_loader(icao_code))
 
 @app.get("/api/special-reports")
 async def get_special_reports():
-    from scraper import scrape_special_reports
-    data = await scrape_special_reports()
-    return data
+    """특보 (캐시, 동시 요청은 수집 1회 공유)"""
+    return await _special_report_cache.get("all", _special_reports_loader)
 
 @app.post("/api/history/save")
 async def save_history(request: Request):
@@ -219,11 +617,27 @@ async def save_history(request: Request):
         logger.error(f"Error in save_history: {str(e)}", exc_info=True)
         return {"success": False, "error": str(e)}
 
+def _paginate(response: Response, items: list, limit: int, make_cursor) -> list:
+    """limit+1개를 조회한 결과를 잘라 내고, 다음 페이지가 있으면 X-Next-Cursor 헤더를 붙입니다."""
+    if len(items) > limit:
+        items = items[:limit]
+        response.headers["X-Next-Cursor"] = make_cursor(items[-1])
+    return items
+
 @app.get("/api/history/snapshots")
-async def list_snapshots():
-    """Get all saved snapshots"""
-    snapshots = await get_all_snapshots()
-    return snapshots
+async def list_snapshots(
+    response: Response,
+    since: str = Query(None),
+    until: str = Query(None),
+    limit: int = Query(HISTORY_PAGE_LIMIT, ge=1, le=HISTORY_MAX_LIMIT),
+    cursor: str = Query(None),
+):
+    """Get saved snapshots, newest first (paged; next page cursor in X-Next-Cursor)"""
+    try:
+        snapshots = await get_all_snapshots(since=since, until=until, limit=limit + 1, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return _paginate(response, snapshots, limit, snapshot_cursor)
 
 @app.get("/api/history/snapshot/{snapshot_id}")
 async def get_snapshot(snapshot_id: int):
@@ -232,10 +646,69 @@ async def get_snapshot(snapshot_id: int):
     return data
 
 @app.get("/api/history/airport/{airport_code}")
-async def get_airport_hist(airport_code: str):
-    """Get historical data for a specific airport"""
-    history = await get_airport_history(airport_code)
-    return history
+async def get_airport_hist(
+    airport_code: str,
+    response: Response,
+    since: str = Query(None),
+    until: str = Query(None),
+    limit: int = Query(HISTORY_PAGE_LIMIT, ge=1, le=HISTORY_MAX_LIMIT),
+    cursor: str = Query(None),
+):
+    """Get historical data for a specific airport, newest observation first (paged; cursor in X-Next-Cursor)"""
+    try:
+        history = await get_airport_history(airport_code, since=since, until=until, limit=limit + 1, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return _paginate(response, history, limit, history_cursor)
+
+@app.get("/api/history/airport/{airport_code}/stats")
+async def get_airport_stats(
+    airport_code: str,
+    bucket: str = Query("day"),
+    since: str = Query(None),
+    until: str = Query(None),
+):
+    """Per-bucket (hour/day/month) temperature/wind/visibility min/max/avg and condition counts for one airport"""
+    try:
+        return await get_history_stats(bucket=bucket, since=since, until=until, airports=[airport_code])
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.get("/api/history/aggregate")
+async def get_history_aggregate(
+    bucket: str = Query("day"),
+    since: str = Query(None),
+    until: str = Query(None),
+    airports: str = Query(None),
+    by_airport: bool = Query(False),
+):
+    """Per-bucket statistics across airports (airports: comma-separated ICAO codes; by_airport splits per airport)"""
+    codes = [code.strip() for code in airports.split(",") if code.strip()] if airports else None
+    try:
+        return await get_history_stats(bucket=bucket, since=since, until=until, airports=codes, by_airport=by_airport)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.get("/api/history/export")
+async def export_history_data(
+    format: str = Query("ndjson"),
+    airports: str = Query(None),
+    since: str = Query(None),
+    until: str = Query(None),
+    include_data: bool = Query(True),
+):
+    """Stream weather_data rows as NDJSON/CSV/Parquet, read in batches (see history_export.py)"""
+    codes = [code.strip() for code in airports.split(",") if code.strip()] if airports else None
+    try:
+        chunks = export_history(DATABASE_PATH, format, airports=codes, since=since, until=until,
+                                include_data=include_data)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return StreamingResponse(
+        chunks,
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="weather_history.{format}"'},
+    )
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,72 @@
+"""
+벤치마크용 KMA 페이지 녹화.
+AMO 메인, 공항별 airport.do, 기상특보 페이지를 렌더링한 뒤 DOM을 bench/fixtures/ 에 저장합니다.
+(dump_special_report_html.py 와 같은 방식이지만 세 종류 페이지를 모두 저장)
+
+리플레이가 네트워크 없이 결정적으로 동작하도록 <script> 태그는 제거하고 저장합니다.
+사용법: python bench/record_fixtures.py
+"""
+import os
+import re
+import sys
+import json
+import asyncio
+from datetime import datetime
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from browser_pool import get_browser_pool, close_browser_pool
+from http_scraper import AMO_MAIN_URL, AMO_FORECAST_URL, parse_airport_list
+from scraper import SPECIAL_REPORT_URL
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+SCRIPT_RE = re.compile(r"<script\b[^>]*>.*?</script>", re.IGNORECASE | re.DOTALL)
+
+
+def _save(name: str, html: str):
+    path = os.path.join(FIXTURES_DIR, name)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(SCRIPT_RE.sub("", html))
+    print(f"  저장: {path} ({len(html) / 1024:.1f}KB)")
+
+
+async def _record(context, url: str, selector: str) -> str:
+    page = await context.new_page()
+    try:
+        await page.goto(url, timeout=60000)
+        await page.wait_for_selector(selector, timeout=30000)
+        return await page.content()
+    finally:
+        await page.close()
+
+
+async def run():
+    os.makedirs(FIXTURES_DIR, exist_ok=True)
+    async with get_browser_pool().context() as context:
+        print(f"AMO 메인 녹화: {AMO_MAIN_URL}")
+        main_html = await _record(context, AMO_MAIN_URL, "li.ca-item")
+        _save("amo_main.html", main_html)
+
+        codes = [item["code"] for item in parse_airport_list(main_html)]
+        for code in codes:
+            print(f"공항 예보 녹화: {code}")
+            try:
+                _save(f"airport_{code}.html", await _record(context, AMO_FORECAST_URL.format(icao=code), ".ts-wrap"))
+            except Exception as e:
+                print(f"  {code} 실패: {e}")
+
+        print(f"특보 녹화: {SPECIAL_REPORT_URL}")
+        _save("special_report.html", await _record(context, SPECIAL_REPORT_URL, ".cmp-weather-cmt-txt-box"))
+
+    with open(os.path.join(FIXTURES_DIR, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump({"recorded_at": datetime.now().isoformat(), "airports": codes}, f, ensure_ascii=False, indent=2)
+
+
+async def main():
+    try:
+        await run()
+    finally:
+        await close_browser_pool()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,86 @@
+"""
+녹화된 KMA 페이지(bench/fixtures/)를 제공하는 로컬 HTTP 서버.
+  /                                → amo_main.html
+  /weather/airport.do?icaoCode=XX  → airport_XX.html
+  /w/special-report/overall.do     → special_report.html
+스크래퍼는 AMO_BASE_URL / WEATHER_BASE_URL 환경 변수를 이 서버 주소로 지정해 사용합니다.
+
+단독 실행: python bench/replay_server.py --port 8765
+"""
+import os
+import argparse
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def resolve_fixture(path: str):
+    """요청 경로 → 픽스처 파일 이름 (없으면 None)"""
+    parsed = urlparse(path)
+    if parsed.path in ("/", "/index.do"):
+        return "amo_main.html"
+    if parsed.path == "/weather/airport.do":
+        icao = (parse_qs(parsed.query).get("icaoCode") or [""])[0]
+        if icao.isalnum():
+            return f"airport_{icao}.html"
+        return None
+    if parsed.path == "/w/special-report/overall.do":
+        return "special_report.html"
+    return None
+
+
+class ReplayHandler(BaseHTTPRequestHandler):
+    fixtures_dir = FIXTURES_DIR
+    # 동일 경로를 반복 요청하므로 메모리에 캐시
+    _cache = {}
+
+    def do_GET(self):
+        name = resolve_fixture(self.path)
+        body = self._load(name) if name else None
+        if body is None:
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _load(self, name: str):
+        if name not in self._cache:
+            path = os.path.join(self.fixtures_dir, name)
+            if not os.path.exists(path):
+                return None
+            with open(path, "rb") as f:
+                self._cache[name] = f.read()
+        return self._cache[name]
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_replay_server(port: int = 0, fixtures_dir: str = FIXTURES_DIR):
+    """백그라운드 스레드에서 서버를 띄우고 (server, base_url)을 반환합니다. port=0 이면 빈 포트 사용."""
+    if not os.path.exists(os.path.join(fixtures_dir, "amo_main.html")):
+        raise FileNotFoundError(f"픽스처가 없습니다: {fixtures_dir} (먼저 bench/record_fixtures.py 실행)")
+    handler = type("Handler", (ReplayHandler,), {"fixtures_dir": fixtures_dir, "_cache": {}})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+    server, base_url = start_replay_server(args.port)
+    print(f"리플레이 서버 실행 중: {base_url} (Ctrl+C 종료)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,218 @@
+"""
+오프라인 스크래퍼 벤치마크.
+bench/fixtures/ 의 녹화 페이지를 로컬 리플레이 서버로 제공하고, 각 엔진을 별도 프로세스에서 실행해
+지연 시간(p50/p95), 최대 RSS(자식 프로세스 = Chromium 포함), 초당 페이지 수를 보고합니다.
+최대 RSS는 psutil 또는 /proc(Linux)으로 재며, 둘 다 없으면 n/a로 표시합니다.
+
+사용법:
+  python bench/record_fixtures.py                      # 최초 1회 (실제 KMA 접속)
+  python bench/run_bench.py --iterations 5
+  python bench/run_bench.py --engines parse,http --json
+엔진: parse(파서만), http, playwright, special_reports
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import threading
+import subprocess
+from typing import Optional
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.dirname(BENCH_DIR))
+from replay_server import start_replay_server, FIXTURES_DIR
+
+ENGINES = ("parse", "http", "playwright", "special_reports")
+
+
+# -----------------------------------------------------------------------------
+# 메모리 측정 (프로세스 트리 RSS 샘플링)
+# -----------------------------------------------------------------------------
+def _tree_rss_bytes(pid: int) -> Optional[int]:
+    """프로세스 트리 RSS 합계. 측정할 수 없으면(psutil 없음 + /proc 없음, 예: Windows) None"""
+    try:
+        import psutil
+        proc = psutil.Process(pid)
+        total = proc.memory_info().rss
+        for child in proc.children(recursive=True):
+            try:
+                total += child.memory_info().rss
+            except psutil.Error:
+                pass
+        return total
+    except ImportError:
+        pass
+
+    # psutil 이 없으면 /proc 에서 직접 (Linux)
+    if not os.path.isdir("/proc") or not hasattr(os, "sysconf"):
+        return None
+    parents, rss = {}, {}
+    page_size = os.sysconf("SC_PAGE_SIZE")
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                fields = f.read().rsplit(")", 1)[1].split()
+            parents[int(entry)] = int(fields[1])
+            rss[int(entry)] = int(fields[21]) * page_size
+        except (OSError, IndexError, ValueError):
+            continue
+    tree, frontier = {pid}, [pid]
+    while frontier:
+        current = frontier.pop()
+        for child, parent in parents.items():
+            if parent == current and child not in tree:
+                tree.add(child)
+                frontier.append(child)
+    return sum(rss.get(p, 0) for p in tree)
+
+
+class PeakRssSampler:
+    def __init__(self, interval: float = 0.05):
+        self.interval = interval
+        self.peak: Optional[int] = None  # 한 번도 측정하지 못하면 None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        pid = os.getpid()
+        while not self._stop.is_set():
+            try:
+                sample = _tree_rss_bytes(pid)
+            except Exception:
+                sample = None
+            if sample is not None:
+                self.peak = max(self.peak or 0, sample)
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+# -----------------------------------------------------------------------------
+# 엔진 실행 (자식 프로세스)
+# -----------------------------------------------------------------------------
+def _percentile(values, pct: float) -> float:
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    k = (len(ordered) - 1) * pct / 100
+    lo, hi = int(k), min(int(k) + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+
+async def _run_engine(engine: str, iterations: int) -> dict:
+    # AMO_BASE_URL 등을 읽은 뒤에 import 해야 하므로 여기서 불러옴
+    import http_scraper
+    from scraper import scrape_weather_and_forecasts, scrape_special_reports
+    from special_report_matcher import match_special_reports
+    from browser_pool import close_browser_pool
+
+    def _parse_once():
+        main = http_scraper.parse_airport_list(open(os.path.join(FIXTURES_DIR, "amo_main.html"), encoding="utf-8").read())
+        for item in main:
+            path = os.path.join(FIXTURES_DIR, f"airport_{item['code']}.html")
+            if os.path.exists(path):
+                http_scraper.parse_forecast_page(open(path, encoding="utf-8").read())
+        from bs4 import BeautifulSoup
+        soup = BeautifulSoup(open(os.path.join(FIXTURES_DIR, "special_report.html"), encoding="utf-8").read(), "html.parser")
+        lines = [line.strip() for p in soup.select(".cmp-weather-cmt-txt-box .paragraph")
+                 for line in p.get_text("\n").split("\n") if line.strip().startswith("o")]
+        match_special_reports(lines)
+        return len(main) + 2
+
+    async def _once() -> int:
+        if engine == "parse":
+            return _parse_once()
+        if engine == "special_reports":
+            await scrape_special_reports()
+            return 1
+        airport_data, forecast_map = await scrape_weather_and_forecasts(engine=engine)
+        return 1 + len(forecast_map)
+
+    durations, pages = [], 0
+    try:
+        with PeakRssSampler() as sampler:
+            for _ in range(iterations):
+                started = time.perf_counter()
+                pages += await _once()
+                durations.append(time.perf_counter() - started)
+    finally:
+        await close_browser_pool()
+        await http_scraper.close_http_client()
+
+    warm = durations[1:] or durations
+    return {
+        "engine": engine,
+        "iterations": iterations,
+        "cold_ms": durations[0] * 1000,
+        "p50_ms": _percentile(warm, 50) * 1000,
+        "p95_ms": _percentile(warm, 95) * 1000,
+        "peak_rss_mb": sampler.peak / (1024 * 1024) if sampler.peak is not None else None,
+        "pages_per_sec": pages / sum(durations) if sum(durations) else 0.0,
+    }
+
+
+def _run_child(engine: str, iterations: int, base_url: str) -> dict:
+    env = dict(os.environ, AMO_BASE_URL=base_url, WEATHER_BASE_URL=base_url, INCREMENTAL_ENABLED="0")
+    proc = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--child", engine, "--iterations", str(iterations)],
+        env=env, capture_output=True, text=True,
+    )
+    for line in reversed(proc.stdout.splitlines()):
+        if line.startswith("{"):
+            return json.loads(line)
+    return {"engine": engine, "error": (proc.stderr or proc.stdout).strip().splitlines()[-1:] or "no output"}
+
+
+def _format_table(results) -> str:
+    header = f"{'engine':<16}{'cold ms':>10}{'p50 ms':>10}{'p95 ms':>10}{'peak RSS MB':>13}{'pages/s':>10}"
+    rows = [header, "-" * len(header)]
+    for r in results:
+        if "error" in r:
+            rows.append(f"{r['engine']:<16}  오류: {r['error']}")
+            continue
+        peak_rss = f"{r['peak_rss_mb']:.1f}" if r["peak_rss_mb"] is not None else "n/a"
+        rows.append(
+            f"{r['engine']:<16}{r['cold_ms']:>10.1f}{r['p50_ms']:>10.1f}{r['p95_ms']:>10.1f}"
+            f"{peak_rss:>13}{r['pages_per_sec']:>10.1f}"
+        )
+    return "\n".join(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--engines", default=",".join(ENGINES))
+    parser.add_argument("--iterations", type=int, default=5)
+    parser.add_argument("--json", action="store_true", help="결과를 JSON 줄로 출력")
+    parser.add_argument("--child", choices=ENGINES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        result = asyncio.run(_run_engine(args.child, args.iterations))
+        print(json.dumps(result))
+        return
+
+    server, base_url = start_replay_server()
+    try:
+        results = [_run_child(engine, args.iterations, base_url) for engine in args.engines.split(",") if engine]
+    finally:
+        server.shutdown()
+
+    if args.json:
+        for r in results:
+            print(json.dumps(r, ensure_ascii=False))
+    else:
+        print(_format_table(results))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+import os
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import Optional
+
+from playwright.async_api import async_playwright
+
+from metrics import metrics
+
+logger = logging.getLogger("browser_pool")
+
+# 브라우저 1개가 처리할 최대 페이지 수 (초과 시 새 브라우저로 교체)
+BROWSER_POOL_MAX_PAGES = int(os.getenv("BROWSER_POOL_MAX_PAGES", "200"))
+BROWSER_POOL_HEADLESS = os.getenv("BROWSER_POOL_HEADLESS", "1") not in ("0", "false", "False")
+
+
+class _BrowserSlot:
+    """실행 중인 Chromium 1개와 사용 현황"""
+
+    def __init__(self, browser):
+        self.browser = browser
+        self.pages_served = 0
+        self.leases = 0
+        self.retired = False
+        self.crashed = False
+        browser.on("disconnected", lambda _: self._mark_crashed())
+
+    def _mark_crashed(self):
+        self.crashed = True
+
+    def healthy(self, max_pages: int) -> bool:
+        return (
+            not self.crashed
+            and self.browser.is_connected()
+            and self.pages_served < max_pages
+        )
+
+
+class BrowserPool:
+    """
+    프로세스 당 하나의 Chromium을 띄워 두고 모든 스크래퍼가 빌려 쓰는 풀.
+    - 최초 사용 시 1회 실행
+    - 빌려줄 때마다 연결 상태 확인, 끊겼으면 재실행
+    - max_pages 페이지를 처리하면 새 브라우저로 교체(기존 대여가 끝나면 종료)
+    """
+
+    def __init__(self, max_pages: int = BROWSER_POOL_MAX_PAGES, headless: bool = BROWSER_POOL_HEADLESS):
+        self.max_pages = max_pages
+        self.headless = headless
+        self.loop = asyncio.get_running_loop()
+        self._lock = asyncio.Lock()
+        self._playwright = None
+        self._slot: Optional[_BrowserSlot] = None
+        self.launch_count = 0
+
+    async def _launch(self) -> _BrowserSlot:
+        if self._playwright is None:
+            self._playwright = await async_playwright().start()
+        with metrics.span("browser_launch"):
+            browser = await self._playwright.chromium.launch(headless=self.headless)
+        self.launch_count += 1
+        logger.info("Chromium launched (#%s)", self.launch_count)
+        return _BrowserSlot(browser)
+
+    async def _retire(self, slot: _BrowserSlot):
+        slot.retired = True
+        if slot.leases == 0:
+            await self._close_slot(slot)
+
+    async def _close_slot(self, slot: _BrowserSlot):
+        try:
+            await slot.browser.close()
+        except Exception:
+            pass
+
+    async def _acquire(self) -> _BrowserSlot:
+        async with self._lock:
+            slot = self._slot
+            if slot is None or not slot.healthy(self.max_pages):
+                if slot is not None:
+                    reason = "crashed" if slot.crashed or not slot.browser.is_connected() else "recycled"
+                    logger.info("Chromium %s after %s pages", reason, slot.pages_served)
+                    metrics.inc("browser_recycles_total", reason=reason)
+                    await self._retire(slot)
+                slot = self._slot = await self._launch()
+            slot.leases += 1
+            return slot
+
+    async def _release(self, slot: _BrowserSlot):
+        slot.leases -= 1
+        if slot.retired and slot.leases == 0:
+            await self._close_slot(slot)
+
+    @asynccontextmanager
+    async def context(self, **context_options):
+        """공유 브라우저에서 새 BrowserContext를 빌려 줍니다. 블록을 벗어나면 닫힙니다."""
+        slot = await self._acquire()
+        ctx = None
+        try:
+            ctx = await slot.browser.new_context(**context_options)
+
+            def _count_page(_):
+                slot.pages_served += 1
+
+            ctx.on("page", _count_page)
+            yield ctx
+        finally:
+            if ctx is not None:
+                try:
+                    await ctx.close()
+                except Exception:
+                    pass
+            await self._release(slot)
+
+    @asynccontextmanager
+    async def page(self, **context_options):
+        """새 컨텍스트 + 페이지 1개를 빌려 줍니다."""
+        async with self.context(**context_options) as ctx:
+            yield await ctx.new_page()
+
+    async def close(self):
+        async with self._lock:
+            if self._slot is not None:
+                await self._close_slot(self._slot)
+                self._slot = None
+            if self._playwright is not None:
+                try:
+                    await self._playwright.stop()
+                except Exception:
+                    pass
+                self._playwright = None
+
+
+_pool: Optional[BrowserPool] = None
+
+
+def get_browser_pool() -> BrowserPool:
+    """현재 이벤트 루프에 묶인 공용 풀을 반환합니다(없으면 생성)."""
+    global _pool
+    loop = asyncio.get_running_loop()
+    if _pool is None or _pool.loop is not loop or loop.is_closed():
+        _pool = BrowserPool()
+    return _pool
+
+
+async def close_browser_pool():
+    """프로세스 종료 전에 호출해 브라우저를 정리합니다."""
+    global _pool
+    if _pool is not None:
+        pool, _pool = _pool, None
+        if pool.loop is asyncio.get_running_loop():
+            await pool.close()
@@ -1,16 +1,102 @@
+import os
+import base64
+import hashlib
 import sqlite3
 import json
 import asyncio
 import logging
-from datetime import datetime
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
 from typing import List, Dict, Optional
 from contextlib import asynccontextmanager
 
+from metrics import metrics
+from retention import apply_retention, dominant_condition, ROLLUP_STATS
+from observation_normalizer import normalize_observation, parse_observed_at, TYPED_COLUMNS
+from snapshot_codec import encode_for_storage, decode_item
+
 DATABASE_PATH = "weather_history.db"
 
+# Number of reader threads; each keeps its own read-only connection
+HISTORY_DB_READERS = int(os.getenv("HISTORY_DB_READERS", "4"))
+
+_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",     # durable at checkpoints; safe with WAL
+    "PRAGMA busy_timeout=5000",
+    "PRAGMA cache_size=-8000",       # 8 MB page cache per connection
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=67108864",     # 64 MB
+)
+
+def _timed(query: str, fn):
+    """Wrap an executor function so its run time lands in history_db_query_seconds"""
+    def _run():
+        with metrics.span("history_db_query", query=query):
+            return fn()
+    return _run
+
+class _ConnectionPool:
+    """
+    One writer connection on a dedicated thread plus one connection per reader thread.
+    In WAL mode readers see the last committed snapshot and never wait behind a write.
+    Connections are kept open, so sqlite3's per-connection statement cache
+    (cached_statements) reuses the prepared form of each query string.
+    """
+
+    def __init__(self, path: str, readers: int = HISTORY_DB_READERS):
+        self.path = path
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="history-db-writer")
+        self._readers = ThreadPoolExecutor(max_workers=max(1, readers), thread_name_prefix="history-db-reader")
+        self._local = threading.local()
+
+    def _connection(self, readonly: bool) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, cached_statements=64)
+            if not readonly:
+                # Must precede journal_mode=WAL, which initialises a new file; no-op on existing files
+                # (retention.py converts those once)
+                conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            for pragma in _PRAGMAS:
+                conn.execute(pragma)
+            if readonly:
+                conn.execute("PRAGMA query_only=ON")
+            self._local.conn = conn
+        return conn
+
+    def _write_job(self, fn):
+        def _run():
+            conn = self._connection(readonly=False)
+            try:
+                return fn(conn)
+            except Exception:
+                conn.rollback()
+                raise
+        return _run
+
+    def write_sync(self, fn):
+        """Run fn(conn) on the writer thread and wait for it (startup / scripts)"""
+        return self._writer.submit(self._write_job(fn)).result()
+
+    async def write(self, query: str, fn):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._writer, _timed(query, self._write_job(fn)))
+
+    async def read(self, query: str, fn):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._readers, _timed(query, lambda: fn(self._connection(readonly=True))))
+
+
+_pool = _ConnectionPool(DATABASE_PATH)
+
 def init_db():
     """Initialize the database with required tables"""
-    conn = sqlite3.connect(DATABASE_PATH)
+    _pool.write_sync(_init_schema)
+
+def _init_schema(conn: sqlite3.Connection):
     cursor = conn.cursor()
     
     # Create snapshots table
@@ -35,93 +121,419 @@ def init_db():
         )
     ''')
     
-    # Create index for faster queries
+    # Create index for faster queries (per-airport history index is added by _migrate)
     cursor.execute('''
-        CREATE INDEX IF NOT EXISTS idx_airport_code 
-        ON weather_data(airport_code)
+        CREATE INDEX IF NOT EXISTS idx_weather_data_snapshot
+        ON weather_data(snapshot_id)
     ''')
     
     conn.commit()
-    conn.close()
+    _migrate(conn)
+
+# Schema versions (PRAGMA user_version):
+#   1 - typed observation columns on weather_data, backfilled from data_json
+#   2 - (airport_code, observed_at, snapshot_id) history index replaces idx_airport_code;
+#       snapshots(created_at) index for the snapshot list
+#   3 - weather_data.condition; weather_hourly / weather_daily rollup tables (see retention.py)
+#   4 - delta snapshots: snapshots.is_keyframe, weather_data.fingerprint (existing snapshots are keyframes)
+#   5 - weather_data.inherited: row repeats the airport's item from the previous snapshot (keyframe copies)
+#   6 - condition re-parsed for feels-like text ("체감(-6.4℃)"); such buckets dropped from rollup condition_counts
+SCHEMA_VERSION = 6
+
+_TYPED_COLUMN_TYPES = {
+    "temp_c": "REAL",        # °C
+    "wind_kt": "REAL",       # knots
+    "visibility_m": "REAL",  # metres
+    "ceiling_ft": "REAL",    # feet
+    "rain_mm": "REAL",       # mm
+    "observed_at": "TEXT",   # UTC ISO-8601, e.g. 2026-01-29T13:30:00Z
+    "condition": "TEXT",     # display category, e.g. 구름많음
+}
+
+# Per-airport rollups of raw rows pruned by retention.py. Means are stored as sum/count so
+# buckets can be merged; bucket_start is a UTC hour (2026-01-29T13:00:00Z) or a KST date (2026-01-29).
+_ROLLUP_TABLE_SQL = '''
+    CREATE TABLE IF NOT EXISTS {table} (
+        airport_code TEXT NOT NULL,
+        bucket_start TEXT NOT NULL,
+        samples INTEGER NOT NULL,
+        temp_min REAL, temp_max REAL, temp_sum REAL, temp_count INTEGER NOT NULL DEFAULT 0,
+        wind_min REAL, wind_max REAL, wind_sum REAL, wind_count INTEGER NOT NULL DEFAULT 0,
+        vis_min REAL, vis_max REAL, vis_sum REAL, vis_count INTEGER NOT NULL DEFAULT 0,
+        condition_counts TEXT NOT NULL DEFAULT '{{}}',
+        dominant_condition TEXT,
+        PRIMARY KEY (airport_code, bucket_start)
+    ) WITHOUT ROWID
+'''
+ROLLUP_TABLES = ("weather_hourly", "weather_daily")
+
+def _migrate(conn: sqlite3.Connection):
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    if version < 1:
+        existing = {row[1] for row in conn.execute("PRAGMA table_info(weather_data)")}
+        for column in TYPED_COLUMNS:
+            if column not in existing:
+                conn.execute(f"ALTER TABLE weather_data ADD COLUMN {column} {_TYPED_COLUMN_TYPES[column]}")
+        count = backfill_typed_columns(conn)
+        logging.info(f"DB: Backfilled typed columns for {count} weather_data rows")
+    if version < 2:
+        conn.execute('''
+            CREATE INDEX IF NOT EXISTS idx_weather_data_airport_observed
+            ON weather_data(airport_code, observed_at, snapshot_id)
+        ''')
+        conn.execute("DROP INDEX IF EXISTS idx_airport_code")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_snapshots_created_at ON snapshots(created_at, id)")
+    if version < 3:
+        if "condition" not in {row[1] for row in conn.execute("PRAGMA table_info(weather_data)")}:
+            conn.execute("ALTER TABLE weather_data ADD COLUMN condition TEXT")
+            backfill_typed_columns(conn, columns=("condition",))
+        for table in ROLLUP_TABLES:
+            conn.execute(_ROLLUP_TABLE_SQL.format(table=table))
+    if version < 4:
+        if "is_keyframe" not in {row[1] for row in conn.execute("PRAGMA table_info(snapshots)")}:
+            conn.execute("ALTER TABLE snapshots ADD COLUMN is_keyframe INTEGER NOT NULL DEFAULT 1")
+        if "fingerprint" not in {row[1] for row in conn.execute("PRAGMA table_info(weather_data)")}:
+            conn.execute("ALTER TABLE weather_data ADD COLUMN fingerprint TEXT")
+    if version < 5:
+        if "inherited" not in {row[1] for row in conn.execute("PRAGMA table_info(weather_data)")}:
+            conn.execute("ALTER TABLE weather_data ADD COLUMN inherited INTEGER NOT NULL DEFAULT 0")
+        # Rows written since v4 carry fingerprints; legacy rows (NULL) stay as they are
+        conn.execute('''
+            UPDATE weather_data SET inherited = 1
+            WHERE id IN (
+                SELECT id FROM (
+                    SELECT id, fingerprint,
+                           LAG(fingerprint) OVER (PARTITION BY airport_code ORDER BY snapshot_id, id) AS previous
+                    FROM weather_data
+                )
+                WHERE fingerprint = previous
+            )
+        ''')
+    if version < 6:
+        # Older rows stored the feels-like text as the condition; re-parse them (icon category or NULL)
+        conn.execute("UPDATE weather_data SET condition = NULL WHERE condition LIKE '%체감%'")
+        backfill_typed_columns(conn, columns=("condition",))
+        for table in ROLLUP_TABLES:
+            rows = conn.execute(
+                f"SELECT airport_code, bucket_start, condition_counts FROM {table} WHERE condition_counts LIKE '%체감%'"
+            ).fetchall()
+            updates = []
+            for airport, bucket, counts in rows:
+                counts = Counter({k: v for k, v in json.loads(counts).items() if "체감" not in k})
+                updates.append((json.dumps(counts, ensure_ascii=False), dominant_condition(counts), airport, bucket))
+            conn.executemany(
+                f"UPDATE {table} SET condition_counts = ?, dominant_condition = ? WHERE airport_code = ? AND bucket_start = ?",
+                updates,
+            )
+    conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+    conn.commit()
+
+def backfill_typed_columns(conn: sqlite3.Connection, columns=TYPED_COLUMNS, batch_size: int = 1000) -> int:
+    """Parse data_json into the given typed columns for rows where they are all still NULL"""
+    assignments = ", ".join(f"{column} = ?" for column in columns)
+    unset = " AND ".join(f"w.{column} IS NULL" for column in columns)
+    last_id, total = 0, 0
+    while True:
+        rows = conn.execute(f'''
+            SELECT w.id, w.data_json, s.timestamp
+            FROM weather_data w
+            JOIN snapshots s ON w.snapshot_id = s.id
+            WHERE w.id > ? AND {unset}
+            ORDER BY w.id
+            LIMIT ?
+        ''', (last_id, batch_size)).fetchall()
+        if not rows:
+            return total
+        updates = []
+        for row_id, data_json, timestamp in rows:
+            try:
+                typed = normalize_observation(decode_item(data_json), timestamp)
+            except (ValueError, AttributeError):
+                continue
+            updates.append([typed[column] for column in columns] + [row_id])
+        conn.executemany(f"UPDATE weather_data SET {assignments} WHERE id = ?", updates)
+        conn.commit()
+        last_id, total = rows[-1][0], total + len(updates)
+
+# Batch size for save_weather_snapshots(): snapshots written per transaction
+HISTORY_DB_BATCH_SIZE = int(os.getenv("HISTORY_DB_BATCH_SIZE", "500"))
+
+# Delta snapshots: a snapshot only stores the airports whose item changed since the previous
+# snapshot and inherits the rest. Every HISTORY_KEYFRAME_INTERVAL-th snapshot is stored in full
+# (a keyframe), so rebuilding one reads at most that many snapshots. 1 stores every snapshot in full.
+# Keyframe rows that repeat the airport's previously stored item are flagged inherited, so history, stats,
+# export and retention rollups see each observation once whatever the keyframe interval.
+HISTORY_KEYFRAME_INTERVAL = int(os.getenv("HISTORY_KEYFRAME_INTERVAL", "24"))
+
+# Re-saving an existing timestamp keeps its id/created_at; the no-op update lets RETURNING yield the id
+_UPSERT_SNAPSHOT_SQL = '''
+    INSERT INTO snapshots (timestamp, created_at) VALUES (?, ?)
+    ON CONFLICT(timestamp) DO UPDATE SET timestamp = excluded.timestamp
+    RETURNING id
+'''
+_WEATHER_COLUMNS = ("airport_code", "airport_name", "data_json", "fingerprint") + TYPED_COLUMNS
+_INSERT_WEATHER_SQL = f'''
+    INSERT INTO weather_data (snapshot_id, {", ".join(_WEATHER_COLUMNS)}, inherited)
+    VALUES (?{", ?" * len(_WEATHER_COLUMNS)}, ?)
+'''
+# Copies an inherited row into another snapshot (used when a delta becomes a keyframe)
+_COPY_WEATHER_SQL = f'''
+    INSERT INTO weather_data (snapshot_id, {", ".join(_WEATHER_COLUMNS)}, inherited)
+    SELECT ?, {", ".join(_WEATHER_COLUMNS)}, 1 FROM weather_data WHERE id = ?
+'''
+
+def _snapshot_timestamp(weather_data: List[Dict]) -> str:
+    # Create timestamp from first item's time or current time
+    # Try different possible keys for time
+    first_item = weather_data[0] if weather_data else {}
+    timestamp = first_item.get('time') or first_item.get('timestamp')
+    if not timestamp:
+        # Include seconds to avoid UNIQUE constraint collisions during quick refreshes
+        timestamp = datetime.now().strftime("%Y년 %m월 %d일(%a) %H:%M:%S(KST)")
+    return timestamp
+
+def _airport_code(item: Dict) -> str:
+    # Robust field extraction
+    return item.get('code') or item.get('icao') or item.get('airport_code') or 'UNKNOWN'
+
+def _fingerprint(item: Dict) -> str:
+    """Content hash of an item; equal fingerprints mean the airport did not change"""
+    payload = json.dumps(item, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:16]
+
+def _weather_rows(snapshot_id: int, weather_data: List[Dict], timestamp: str, previous: Dict[str, str]):
+    """Insert rows; previous maps airport code -> its last stored fingerprint (rows equal to it are inherited)"""
+    for item in weather_data:
+        airport_code = _airport_code(item)
+        airport_name = item.get('name') or item.get('airportName') or 'Unknown'
+        fingerprint = _fingerprint(item)
+        typed = normalize_observation(item, fallback_time=timestamp)
+        # data_json holds a dictionary-compressed BLOB (snapshot_codec.py); older rows are JSON text
+        yield (snapshot_id, airport_code, airport_name, encode_for_storage(item), fingerprint,
+               *(typed[column] for column in TYPED_COLUMNS), int(previous.get(airport_code) == fingerprint))
+
+def _keyframe_of(conn: sqlite3.Connection, snapshot_id: int) -> Optional[int]:
+    """Id of the keyframe a snapshot is rebuilt from (itself for keyframes), None if it does not exist"""
+    row = conn.execute("SELECT is_keyframe FROM snapshots WHERE id = ?", (snapshot_id,)).fetchone()
+    if row is None:
+        return None
+    if row[0]:
+        return snapshot_id
+    keyframe = conn.execute(
+        "SELECT id FROM snapshots WHERE id < ? AND is_keyframe = 1 ORDER BY id DESC LIMIT 1", (snapshot_id,)
+    ).fetchone()
+    return keyframe[0] if keyframe else 0
+
+def _resolve_rows(conn: sqlite3.Connection, snapshot_id: int, columns: str) -> List[tuple]:
+    """
+    Rows making up a full snapshot: its own rows plus, for every other airport,
+    the latest row since its keyframe. Each tuple is (row id, airport_code, *columns).
+    """
+    keyframe_id = _keyframe_of(conn, snapshot_id)
+    if keyframe_id is None:
+        return []
+    resolved, seen = [], set()
+    for row in conn.execute(f'''
+        SELECT snapshot_id, id, airport_code, {columns}
+        FROM weather_data
+        WHERE snapshot_id BETWEEN ? AND ?
+        ORDER BY snapshot_id DESC, id
+    ''', (keyframe_id, snapshot_id)):
+        if row[0] == snapshot_id or row[2] not in seen:
+            resolved.append(row[1:])
+            seen.add(row[2])
+    return resolved
+
+def _make_keyframe(cursor: sqlite3.Cursor, snapshot_id: int):
+    """Copy the inherited rows into a delta snapshot so it no longer depends on earlier ones"""
+    inherited = [(snapshot_id, row_id)
+                 for row_id, _, owner in _resolve_rows(cursor.connection, snapshot_id, "snapshot_id")
+                 if owner != snapshot_id]
+    cursor.executemany(_COPY_WEATHER_SQL, inherited)
+    cursor.execute("UPDATE snapshots SET is_keyframe = 1 WHERE id = ?", (snapshot_id,))
+
+def _snapshot_state(conn: sqlite3.Connection, snapshot_id: Optional[int]) -> Dict[str, str]:
+    """Airport code -> item fingerprint of a full (rebuilt) snapshot"""
+    if snapshot_id is None:
+        return {}
+    return {code: fingerprint for _, code, fingerprint in _resolve_rows(conn, snapshot_id, "fingerprint")}
+
+def _changed_items(cursor: sqlite3.Cursor, snapshot_id: int, previous_id: Optional[int],
+                   previous: Dict[str, str], weather_data: List[Dict]) -> Optional[List[Dict]]:
+    """
+    Items that differ from the previous snapshot, or None when this snapshot must be a keyframe:
+    first snapshot, keyframe interval reached, an airport disappeared, duplicate codes,
+    or every airport changed anyway.
+    """
+    if HISTORY_KEYFRAME_INTERVAL <= 1 or previous_id is None:
+        return None
+    keyframe_id = _keyframe_of(cursor.connection, previous_id)
+    depth = cursor.execute(
+        "SELECT COUNT(*) FROM snapshots WHERE id >= ? AND id < ?", (keyframe_id, snapshot_id)
+    ).fetchone()[0]
+    if depth >= HISTORY_KEYFRAME_INTERVAL:
+        return None
+
+    codes = [_airport_code(item) for item in weather_data]
+    if len(set(codes)) != len(codes) or not previous.keys() <= set(codes):
+        return None
+    changed = [item for code, item in zip(codes, weather_data) if previous.get(code) != _fingerprint(item)]
+    return changed if len(changed) < len(weather_data) else None
+
+def _last_fingerprints(cursor: sqlite3.Cursor, snapshot_id: int, codes, previous: Dict[str, str]) -> Dict[str, str]:
+    """previous plus, for airports missing from it, the airport's last stored row before this snapshot"""
+    last = dict(previous)
+    for code in set(codes) - last.keys():
+        row = cursor.execute('''
+            SELECT fingerprint FROM weather_data WHERE airport_code = ? AND snapshot_id < ?
+            ORDER BY snapshot_id DESC, id DESC LIMIT 1
+        ''', (code, snapshot_id)).fetchone()
+        if row:
+            last[code] = row[0]
+    return last
+
+def _refresh_inherited_after(cursor: sqlite3.Cursor, snapshot_id: int):
+    """After rewriting an older snapshot, re-flag each airport's next stored row against the row now before it"""
+    for (code,) in cursor.execute(
+        "SELECT DISTINCT airport_code FROM weather_data WHERE snapshot_id > ?", (snapshot_id,)
+    ).fetchall():
+        following = cursor.execute('''
+            SELECT id, fingerprint FROM weather_data WHERE airport_code = ? AND snapshot_id > ?
+            ORDER BY snapshot_id, id LIMIT 1
+        ''', (code, snapshot_id)).fetchone()
+        last = _last_fingerprints(cursor, snapshot_id + 1, [code], {}).get(code)  # up to and including this one
+        cursor.execute("UPDATE weather_data SET inherited = ? WHERE id = ?",
+                       (int(following[1] is not None and following[1] == last), following[0]))
+
+def _write_snapshot(cursor: sqlite3.Cursor, weather_data: List[Dict], created_at: str) -> int:
+    """Upsert one snapshot and replace its rows (caller owns the transaction)"""
+    timestamp = _snapshot_timestamp(weather_data)
+    cursor.execute(_UPSERT_SNAPSHOT_SQL, (timestamp, created_at))
+    snapshot_id = cursor.fetchone()[0]
+    # Re-saving an older snapshot: detach the next one first if it inherits rows from this one
+    following = cursor.execute(
+        "SELECT id, is_keyframe FROM snapshots WHERE id > ? ORDER BY id LIMIT 1", (snapshot_id,)
+    ).fetchone()
+    if following and not following[1]:
+        _make_keyframe(cursor, following[0])
+
+    previous_id = cursor.execute(
+        "SELECT id FROM snapshots WHERE id < ? ORDER BY id DESC LIMIT 1", (snapshot_id,)
+    ).fetchone()
+    previous_id = previous_id[0] if previous_id else None
+    previous = _snapshot_state(cursor.connection, previous_id)
+    changed = _changed_items(cursor, snapshot_id, previous_id, previous, weather_data)
+    # Delete existing weather data for this snapshot (if updating)
+    cursor.execute('DELETE FROM weather_data WHERE snapshot_id = ?', (snapshot_id,))
+    rows = weather_data if changed is None else changed
+    last = _last_fingerprints(cursor, snapshot_id, map(_airport_code, rows), previous)
+    cursor.executemany(_INSERT_WEATHER_SQL, _weather_rows(snapshot_id, rows, timestamp, last))
+    cursor.execute("UPDATE snapshots SET is_keyframe = ? WHERE id = ?", (int(changed is None), snapshot_id))
+    if following:
+        # Later rows were flagged against this snapshot's old content
+        _refresh_inherited_after(cursor, snapshot_id)
+    return snapshot_id
+
+def _save_batch(conn: sqlite3.Connection, snapshots: List[List[Dict]]) -> List[int]:
+    """Write snapshots in one explicit transaction"""
+    created_at = datetime.now().isoformat()
+    cursor = conn.cursor()
+    cursor.execute("BEGIN IMMEDIATE")
+    ids = [_write_snapshot(cursor, weather_data, created_at) for weather_data in snapshots]
+    conn.commit()
+    return ids
 
 async def save_weather_snapshot(weather_data: List[Dict]) -> int:
     """Save a weather data snapshot"""
     print(f"DEBUG: save_weather_snapshot called with {len(weather_data)} items")
-    loop = asyncio.get_event_loop()
-    
-    def _save():
-        conn = sqlite3.connect(DATABASE_PATH)
-        cursor = conn.cursor()
-        
-        # Create timestamp from first item's time or current time
-        # Try different possible keys for time
-        first_item = weather_data[0] if weather_data else {}
-        timestamp = first_item.get('time') or first_item.get('timestamp')
-        
-        if not timestamp:
-            # Include seconds to avoid UNIQUE constraint collisions during quick refreshes
-            timestamp = datetime.now().strftime("%Y년 %m월 %d일(%a) %H:%M:%S(KST)")
-        
-        logging.info(f"DB: Using timestamp '{timestamp}'")
-        created_at = datetime.now().isoformat()
-        
-        # Insert snapshot
-        cursor.execute(
-            'INSERT OR IGNORE INTO snapshots (timestamp, created_at) VALUES (?, ?)',
-            (timestamp, created_at)
-        )
-        
-        # Get snapshot_id
-        cursor.execute('SELECT id FROM snapshots WHERE timestamp = ?', (timestamp,))
-        row = cursor.fetchone()
-        if not row:
-            print("ERROR: Failed to retrieve snapshot ID after insert")
-            conn.close()
-            return -1
-        snapshot_id = row[0]
-        print(f"DEBUG: Snapshot ID is {snapshot_id}")
-        
-        # Delete existing weather data for this snapshot (if updating)
-        cursor.execute('DELETE FROM weather_data WHERE snapshot_id = ?', (snapshot_id,))
-        
-        # Insert weather data
-        count = 0
-        for item in weather_data:
-            # Robust field extraction
-            airport_code = item.get('code') or item.get('icao') or item.get('airport_code') or 'UNKNOWN'
-            airport_name = item.get('name') or item.get('airportName') or 'Unknown'
-            
-            cursor.execute('''
-                INSERT INTO weather_data (snapshot_id, airport_code, airport_name, data_json)
-                VALUES (?, ?, ?, ?)
-            ''', (
-                snapshot_id,
-                airport_code,
-                airport_name,
-                json.dumps(item, ensure_ascii=False)
-            ))
-            count += 1
-        
-        conn.commit()
-        conn.close()
-        logging.info(f"DB: Successfully saved {count} airport records to snapshot {snapshot_id}")
-        return snapshot_id
-    
-    return await loop.run_in_executor(None, _save)
+    ids = await _pool.write("save_weather_snapshot", lambda conn: _save_batch(conn, [weather_data]))
+    logging.info(f"DB: Successfully saved {len(weather_data)} airport records to snapshot {ids[0]}")
+    return ids[0]
 
-async def get_all_snapshots() -> List[Dict]:
-    """Get all saved snapshots"""
-    loop = asyncio.get_event_loop()
-    
-    def _get():
-        conn = sqlite3.connect(DATABASE_PATH)
+async def save_weather_snapshots(snapshots: List[List[Dict]], batch_size: int = HISTORY_DB_BATCH_SIZE) -> List[int]:
+    """
+    Save many snapshots (backfills / archive imports), batch_size snapshots per transaction.
+    Returns snapshot ids in input order; a snapshot whose timestamp already exists replaces its rows.
+    """
+    ids: List[int] = []
+    for start in range(0, len(snapshots), max(1, batch_size)):
+        batch = snapshots[start:start + batch_size]
+        ids.extend(await _pool.write("save_weather_snapshots", lambda conn, batch=batch: _save_batch(conn, batch)))
+    logging.info(f"DB: Saved {len(ids)} snapshots")
+    return ids
+
+def encode_cursor(*values) -> str:
+    """Opaque keyset-pagination cursor for the history endpoints"""
+    return base64.urlsafe_b64encode(json.dumps(values).encode("utf-8")).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: str) -> list:
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (ValueError, TypeError):
+        raise ValueError("invalid cursor")
+    if not isinstance(values, list) or len(values) != 2:
+        raise ValueError("invalid cursor")
+    return values
+
+def snapshot_cursor(snapshot: Dict) -> str:
+    """Cursor that continues get_all_snapshots() after this item"""
+    return encode_cursor(snapshot['created_at'], snapshot['id'])
+
+def history_cursor(record: Dict) -> str:
+    """Cursor that continues get_airport_history() after this item"""
+    return encode_cursor(record['observed_at'], record['snapshot_id'])
+
+def _to_observed_at(value: Optional[str], name: str) -> Optional[str]:
+    if value is None:
+        return None
+    observed_at = parse_observed_at(value)
+    if observed_at is None:
+        raise ValueError(f"invalid {name}: {value}")
+    return observed_at
+
+def _to_created_at(value: Optional[str], name: str) -> Optional[str]:
+    """Same input rules as _to_observed_at, rendered like snapshots.created_at (server-local naive ISO)"""
+    observed_at = _to_observed_at(value, name)
+    if observed_at is None:
+        return None
+    utc = datetime.strptime(observed_at, "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=timezone.utc)
+    return utc.astimezone().replace(tzinfo=None).isoformat()
+
+async def get_all_snapshots(since: Optional[str] = None, until: Optional[str] = None,
+                            limit: Optional[int] = None, cursor: Optional[str] = None) -> List[Dict]:
+    """
+    Get saved snapshots, newest first.
+    since/until filter created_at (ISO or KMA display time; naive values are KST, since <= t < until),
+    raising ValueError when they cannot be parsed;
+    cursor comes from snapshot_cursor() of the last item of the previous page.
+    """
+    conditions, params = [], []
+    since, until = _to_created_at(since, "since"), _to_created_at(until, "until")
+    if since:
+        conditions.append("created_at >= ?")
+        params.append(since)
+    if until:
+        conditions.append("created_at < ?")
+        params.append(until)
+    if cursor:
+        created_at, snapshot_id = decode_cursor(cursor)
+        conditions.append("(created_at < ? OR (created_at = ? AND id < ?))")
+        params.extend([created_at, created_at, snapshot_id])
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    limit_sql = "LIMIT ?" if limit else ""
+    if limit:
+        params.append(limit)
+
+    def _get(conn):
         cursor = conn.cursor()
         
-        cursor.execute('''
+        cursor.execute(f'''
             SELECT id, timestamp, created_at 
             FROM snapshots 
-            ORDER BY created_at DESC
-        ''')
+            {where}
+            ORDER BY created_at DESC, id DESC
+            {limit_sql}
+        ''', params)
         
         snapshots = []
         for row in cursor.fetchall():
@@ -130,63 +542,185 @@ async def get_all_snapshots() -> List[Dict]:
                 'timestamp': row[1],
                 'created_at': row[2]
             })
-        
-        conn.close()
         return snapshots
     
-    return await loop.run_in_executor(None, _get)
+    return await _pool.read("get_all_snapshots", _get)
 
 async def get_snapshot_data(snapshot_id: int) -> List[Dict]:
-    """Get all weather data for a specific snapshot"""
-    loop = asyncio.get_event_loop()
+    """Get all weather data for a specific snapshot (delta snapshots are rebuilt from their keyframe)"""
+    def _get(conn):
+        rows = _resolve_rows(conn, snapshot_id, "airport_name, data_json")
+        rows.sort(key=lambda row: row[2])
+        return [decode_item(row[3]) for row in rows]
     
-    def _get():
-        conn = sqlite3.connect(DATABASE_PATH)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT data_json 
-            FROM weather_data 
-            WHERE snapshot_id = ?
-            ORDER BY airport_name
-        ''', (snapshot_id,))
-        
-        data = []
-        for row in cursor.fetchall():
-            data.append(json.loads(row[0]))
-        
-        conn.close()
-        return data
-    
-    return await loop.run_in_executor(None, _get)
+    return await _pool.read("get_snapshot_data", _get)
 
-async def get_airport_history(airport_code: str) -> List[Dict]:
-    """Get historical data for a specific airport across all snapshots"""
-    loop = asyncio.get_event_loop()
-    
-    def _get():
-        conn = sqlite3.connect(DATABASE_PATH)
+async def get_airport_history(airport_code: str, since: Optional[str] = None, until: Optional[str] = None,
+                              limit: Optional[int] = None, cursor: Optional[str] = None) -> List[Dict]:
+    """
+    Get historical data for a specific airport, newest observation first.
+    since/until filter observed_at (ISO or KMA display time; naive values are KST, since <= t < until);
+    cursor comes from history_cursor() of the last item of the previous page.
+    Served from the (airport_code, observed_at, snapshot_id) index. With delta snapshots an
+    unchanged observation is listed once, under the snapshot that first recorded it
+    (keyframe copies are flagged inherited and skipped).
+    """
+    conditions, params = ["w.airport_code = ?", "NOT w.inherited"], [airport_code]
+    since, until = _to_observed_at(since, "since"), _to_observed_at(until, "until")
+    if since:
+        conditions.append("w.observed_at >= ?")
+        params.append(since)
+    if until:
+        conditions.append("w.observed_at < ?")
+        params.append(until)
+    if cursor:
+        observed_at, snapshot_id = decode_cursor(cursor)
+        conditions.append("(w.observed_at < ? OR (w.observed_at = ? AND w.snapshot_id < ?))")
+        params.extend([observed_at, observed_at, snapshot_id])
+    limit_sql = "LIMIT ?" if limit else ""
+    if limit:
+        params.append(limit)
+
+    def _get(conn):
         cursor = conn.cursor()
         
-        cursor.execute('''
-            SELECT s.timestamp, s.created_at, w.data_json
+        cursor.execute(f'''
+            SELECT s.timestamp, s.created_at, w.data_json, w.observed_at, w.snapshot_id
             FROM weather_data w
             JOIN snapshots s ON w.snapshot_id = s.id
-            WHERE w.airport_code = ?
-            ORDER BY s.created_at DESC
-        ''', (airport_code,))
+            WHERE {' AND '.join(conditions)}
+            ORDER BY w.observed_at DESC, w.snapshot_id DESC
+            {limit_sql}
+        ''', params)
         
         history = []
         for row in cursor.fetchall():
-            data = json.loads(row[2])
+            data = decode_item(row[2])
             data['snapshot_timestamp'] = row[0]
             data['snapshot_created_at'] = row[1]
+            data['observed_at'] = row[3]
+            data['snapshot_id'] = row[4]
             history.append(data)
-        
-        conn.close()
         return history
     
-    return await loop.run_in_executor(None, _get)
+    return await _pool.read("get_airport_history", _get)
+
+# Stats bucket sizes: raw-row bucket expression, rollup table, rollup bucket expression.
+# Hours are UTC ("2026-01-29T13:00:00Z"); days ("2026-01-29") and months ("2026-01") are KST.
+STATS_BUCKETS = {
+    "hour": ("strftime('%Y-%m-%dT%H:00:00Z', observed_at)", "weather_hourly", "bucket_start"),
+    "day": ("date(observed_at, '+9 hours')", "weather_daily", "bucket_start"),
+    "month": ("strftime('%Y-%m', observed_at, '+9 hours')", "weather_daily", "substr(bucket_start, 1, 7)"),
+}
+# Output name for each rollup column prefix
+_STATS_NAMES = {"temp": "temp", "wind": "wind", "vis": "visibility"}
+_KST = timezone(timedelta(hours=9))
+
+def _kst_day_ceil(observed_at: str) -> str:
+    """First KST date whose midnight is at or after the given UTC timestamp"""
+    local = datetime.strptime(observed_at, "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=timezone.utc).astimezone(_KST)
+    if local.time() != datetime.min.time():
+        local += timedelta(days=1)
+    return local.date().isoformat()
+
+def _stats_sources(bucket: str, since: Optional[str], until: Optional[str], airports: Optional[List[str]]):
+    """WHERE clauses and params for raw rows and for the rollup table of this bucket size"""
+    rollup_table = STATS_BUCKETS[bucket][1]
+    raw, raw_params = ["observed_at IS NOT NULL", "NOT inherited"], []
+    rollup, rollup_params = [], []
+    if airports:
+        marks = ", ".join("?" * len(airports))
+        raw.append(f"airport_code IN ({marks})")
+        rollup.append(f"airport_code IN ({marks})")
+        raw_params.extend(airports)
+        rollup_params.extend(airports)
+    # Rollup buckets count when their start lies in [since, until)
+    for value, op in ((since, ">="), (until, "<")):
+        if value:
+            raw.append(f"observed_at {op} ?")
+            raw_params.append(value)
+            rollup.append(f"bucket_start {op} ?")
+            rollup_params.append(value if rollup_table == "weather_hourly" else _kst_day_ceil(value))
+    return (" AND ".join(raw), raw_params), (" AND ".join(rollup) or "1", rollup_params)
+
+def _history_stats(conn: sqlite3.Connection, bucket: str, since: Optional[str], until: Optional[str],
+                   airports: Optional[List[str]], by_airport: bool) -> List[Dict]:
+    raw_bucket, rollup_table, rollup_bucket = STATS_BUCKETS[bucket]
+    (raw_where, raw_params), (rollup_where, rollup_params) = _stats_sources(bucket, since, until, airports)
+    keys = "airport_code, bucket" if by_airport else "bucket"
+    stat_columns = [f"{prefix}_{agg}" for prefix, _ in ROLLUP_STATS for agg in ("min", "max", "sum", "count")]
+    # Column names of a UNION come from its first SELECT, so the raw side is aliased
+    raw_stats = ", ".join(
+        f"{agg.upper()}({col}) AS {prefix}_{agg}"
+        for prefix, col in ROLLUP_STATS for agg in ("min", "max", "sum", "count")
+    )
+    merged_stats = ", ".join(
+        f"MIN({prefix}_min), MAX({prefix}_max), SUM({prefix}_sum), SUM({prefix}_count)" for prefix, _ in ROLLUP_STATS
+    )
+
+    # Raw rows are grouped in SQL, then merged with rollups of rows retention.py already pruned
+    buckets = {}
+    for row in conn.execute(f'''
+        SELECT {keys}, SUM(samples), {merged_stats}
+        FROM (
+            SELECT airport_code, {raw_bucket} AS bucket, COUNT(*) AS samples, {raw_stats}
+            FROM weather_data WHERE {raw_where}
+            GROUP BY 1, 2
+            UNION ALL
+            SELECT airport_code, {rollup_bucket}, samples, {", ".join(stat_columns)}
+            FROM {rollup_table} WHERE {rollup_where}
+        )
+        GROUP BY {keys}
+        ORDER BY {keys}
+    ''', raw_params + rollup_params):
+        key = row[:len(row) - len(stat_columns) - 1]
+        values = dict(zip(["samples"] + stat_columns, row[len(key):]))
+        item = {"airport_code": key[0]} if by_airport else {}
+        item["bucket"], item["samples"] = key[-1], values["samples"]
+        for prefix, _ in ROLLUP_STATS:
+            count = values[f"{prefix}_count"]
+            item[_STATS_NAMES[prefix]] = {
+                "min": values[f"{prefix}_min"],
+                "max": values[f"{prefix}_max"],
+                "avg": round(values[f"{prefix}_sum"] / count, 2) if count else None,
+            }
+        item["conditions"] = {}
+        buckets[key] = item
+
+    for row in conn.execute(f'''
+        SELECT {keys}, condition, SUM(n)
+        FROM (
+            SELECT airport_code, {raw_bucket} AS bucket, condition, COUNT(*) AS n
+            FROM weather_data WHERE {raw_where} AND condition IS NOT NULL
+            GROUP BY 1, 2, 3
+            UNION ALL
+            SELECT airport_code, {rollup_bucket}, c.key, c.value
+            FROM {rollup_table}, json_each({rollup_table}.condition_counts) c WHERE {rollup_where}
+        )
+        GROUP BY {keys}, condition
+    ''', raw_params + rollup_params):
+        if row[:-2] in buckets:
+            buckets[row[:-2]]["conditions"][row[-2]] = row[-1]
+    return list(buckets.values())
+
+async def get_history_stats(bucket: str = "day", since: Optional[str] = None, until: Optional[str] = None,
+                            airports: Optional[List[str]] = None, by_airport: bool = False) -> List[Dict]:
+    """
+    Per-bucket statistics computed in SQL, oldest bucket first:
+    {"bucket", "samples", "temp"/"wind"/"visibility": {"min", "max", "avg"}, "conditions": {category: count}}
+    plus "airport_code" when by_airport. bucket is hour/day/month (see STATS_BUCKETS);
+    since/until filter observed_at like get_airport_history(); airports limits the airport codes.
+    Includes the hourly/daily rollups of pruned raw rows (hour buckets only go back as far as weather_hourly).
+    """
+    if bucket not in STATS_BUCKETS:
+        raise ValueError(f"invalid bucket: {bucket} (expected one of {', '.join(STATS_BUCKETS)})")
+    since, until = _to_observed_at(since, "since"), _to_observed_at(until, "until")
+    return await _pool.read("get_history_stats",
+                            lambda conn: _history_stats(conn, bucket, since, until, airports, by_airport))
+
+async def run_retention(**kwargs) -> Dict:
+    """Apply the retention policy (rollups, pruning, incremental vacuum) on the writer thread; see retention.py"""
+    return await _pool.write("retention", lambda conn: apply_retention(conn, **kwargs))
 
 # Initialize database on module import
 init_db()
@@ -0,0 +1,100 @@
+"""
+공항별 수집 작업 스케줄러.
+- 동시 실행 수 제한 (세마포어)
+- 공항별 타임아웃 + 지수 백오프 재시도
+- 전체 수집 마감 시간 (넘으면 남은 공항은 건너뜀)
+실패해도 예외를 던지지 않고, 공항별 상태가 담긴 부분 결과를 돌려줍니다.
+"""
+import os
+import time
+import random
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, Iterable
+
+from metrics import metrics
+
+logger = logging.getLogger("fetch_scheduler")
+
+FORECAST_CONCURRENCY = int(os.getenv("FORECAST_CONCURRENCY", "4"))
+FORECAST_TIMEOUT_SECONDS = float(os.getenv("FORECAST_TIMEOUT_SECONDS", "20"))
+FORECAST_RETRIES = int(os.getenv("FORECAST_RETRIES", "2"))
+FORECAST_BACKOFF_SECONDS = float(os.getenv("FORECAST_BACKOFF_SECONDS", "1.0"))
+FORECAST_DEADLINE_SECONDS = float(os.getenv("FORECAST_DEADLINE_SECONDS", "120"))
+
+# 공항별 결과 상태
+STATUS_OK = "ok"
+STATUS_EMPTY = "empty"          # 응답은 받았지만 데이터 없음
+STATUS_TIMEOUT = "timeout"      # 마지막 시도가 타임아웃
+STATUS_ERROR = "error"          # 마지막 시도가 예외
+STATUS_DEADLINE = "deadline"    # 전체 마감 시간 초과로 시도/재시도하지 못함
+
+
+async def run_bounded(
+    keys: Iterable[str],
+    fetch: Callable[[str], Awaitable],
+    concurrency: int = FORECAST_CONCURRENCY,
+    timeout: float = FORECAST_TIMEOUT_SECONDS,
+    retries: int = FORECAST_RETRIES,
+    backoff: float = FORECAST_BACKOFF_SECONDS,
+    deadline: float = FORECAST_DEADLINE_SECONDS,
+) -> Dict[str, Dict]:
+    """
+    keys 각각에 대해 fetch(key)를 실행합니다.
+    반환: {key: {"status", "data", "attempts", "error", "elapsed"}}
+    빈 결과(None, [], {})도 재시도 대상이며 끝까지 비면 status="empty" 입니다.
+    """
+    keys = list(dict.fromkeys(keys))
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    deadline_at = time.monotonic() + deadline
+
+    def _remaining() -> float:
+        return deadline_at - time.monotonic()
+
+    async def _run_one(key: str) -> Dict:
+        result = {"status": STATUS_DEADLINE, "data": None, "attempts": 0, "error": None, "elapsed": 0.0}
+        started = time.monotonic()
+        for attempt in range(retries + 1):
+            if attempt:
+                delay = backoff * (2 ** (attempt - 1)) * (0.5 + random.random())
+                if _remaining() <= delay:
+                    break
+                await asyncio.sleep(delay)
+
+            async with semaphore:
+                budget = min(timeout, _remaining())
+                if budget <= 0:
+                    break
+                result["attempts"] = attempt + 1
+                try:
+                    data = await asyncio.wait_for(fetch(key), timeout=budget)
+                except asyncio.TimeoutError:
+                    result.update(status=STATUS_TIMEOUT, error=f"timeout after {budget:.1f}s")
+                    continue
+                except Exception as e:
+                    result.update(status=STATUS_ERROR, error=str(e))
+                    continue
+
+            if data:
+                result.update(status=STATUS_OK, data=data, error=None)
+                break
+            result.update(status=STATUS_EMPTY, data=data, error=None)
+
+        result["elapsed"] = time.monotonic() - started
+        metrics.inc("fetch_results_total", status=result["status"])
+        metrics.inc("fetch_attempts_total", result["attempts"])
+        metrics.observe("fetch_airport_seconds", result["elapsed"], airport=key)
+        if result["status"] != STATUS_OK:
+            logger.warning("%s: %s after %s attempt(s) (%s)", key, result["status"], result["attempts"], result["error"])
+        return result
+
+    results = await asyncio.gather(*(_run_one(key) for key in keys))
+    return dict(zip(keys, results))
+
+
+def summarize_status(results: Dict[str, Dict]) -> str:
+    """로그용 요약: "ok 13, timeout 1, error 1" """
+    counts: Dict[str, int] = {}
+    for r in results.values():
+        counts[r["status"]] = counts.get(r["status"], 0) + 1
+    return ", ".join(f"{status} {n}" for status, n in sorted(counts.items()))
@@ -0,0 +1,226 @@
+"""
+weather_history.db 대량 내보내기 (오프라인 분석용).
+- weather_data 를 id 순 keyset 커서로 HISTORY_EXPORT_BATCH_SIZE 행씩 읽어 바로 내보냄 → 메모리 사용량 일정
+- 형식: ndjson, csv, parquet (pyarrow 설치 시에만)
+- 공항(ICAO 목록) / 관측 시각(since <= observed_at < until) 필터
+델타 스냅샷(database.py)에서는 공항별로 바뀐 관측만 1번씩 나옵니다 (키프레임의 반복 행(inherited) 제외).
+
+사용법:
+  python history_export.py --format csv --airport RKSI --since 2026-01-01 -o rksi.csv
+  python history_export.py --format ndjson > history.ndjson
+API: GET /api/history/export?format=ndjson&airports=RKSI,RKSS&since=...&until=...
+"""
+import os
+import io
+import csv
+import sys
+import json
+import sqlite3
+import argparse
+from typing import Dict, Iterator, List, Optional
+
+from observation_normalizer import parse_observed_at, TYPED_COLUMNS
+from snapshot_codec import decode_item
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # pyarrow 미설치 시 parquet 형식 제외
+    pyarrow = None
+
+HISTORY_EXPORT_BATCH_SIZE = int(os.getenv("HISTORY_EXPORT_BATCH_SIZE", "1000"))
+
+# 형식 → Content-Type
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+    "parquet": "application/vnd.apache.parquet",
+}
+EXPORT_COLUMNS = ("snapshot_id", "snapshot_timestamp", "airport_code", "airport_name") + TYPED_COLUMNS
+
+_REAL_COLUMNS = {"temp_c", "wind_kt", "visibility_m", "ceiling_ft", "rain_mm"}
+
+
+def _bound(value: Optional[str], name: str) -> Optional[str]:
+    if value is None:
+        return None
+    observed_at = parse_observed_at(value)
+    if observed_at is None:
+        raise ValueError(f"invalid {name}: {value}")
+    return observed_at
+
+
+def iter_batches(conn: sqlite3.Connection, airports: Optional[List[str]] = None,
+                 since: Optional[str] = None, until: Optional[str] = None,
+                 include_data: bool = True, batch_size: int = HISTORY_EXPORT_BATCH_SIZE) -> Iterator[List[Dict]]:
+    """필터에 맞는 행을 batch_size 개씩 dict 목록으로. since/until 은 UTC observed_at 문자열"""
+    conditions, params = ["w.id > ?", "NOT w.inherited"], []
+    if airports:
+        conditions.append(f"w.airport_code IN ({', '.join('?' * len(airports))})")
+        params.extend(airports)
+    if since:
+        conditions.append("w.observed_at >= ?")
+        params.append(since)
+    if until:
+        conditions.append("w.observed_at < ?")
+        params.append(until)
+    query = f'''
+        SELECT w.id, w.snapshot_id, s.timestamp, w.airport_code, w.airport_name,
+               {", ".join(f"w.{column}" for column in TYPED_COLUMNS)}, w.data_json
+        FROM weather_data w
+        JOIN snapshots s ON w.snapshot_id = s.id
+        WHERE {" AND ".join(conditions)}
+        ORDER BY w.id
+        LIMIT ?
+    '''
+    last_id = 0
+    while True:
+        rows = conn.execute(query, [last_id] + params + [batch_size]).fetchall()
+        if not rows:
+            return
+        batch = []
+        for row in rows:
+            record = dict(zip(EXPORT_COLUMNS, row[1:-1]))
+            if include_data:
+                record["data"] = decode_item(row[-1])
+            batch.append(record)
+        yield batch
+        last_id = rows[-1][0]
+
+
+def _ndjson_chunks(batches: Iterator[List[Dict]]) -> Iterator[bytes]:
+    for batch in batches:
+        yield "".join(json.dumps(record, ensure_ascii=False) + "\n" for record in batch).encode("utf-8")
+
+
+def _csv_chunks(batches: Iterator[List[Dict]], include_data: bool) -> Iterator[bytes]:
+    columns = EXPORT_COLUMNS + (("data",) if include_data else ())
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for batch in batches:
+        for record in batch:
+            if include_data:
+                record["data"] = json.dumps(record["data"], ensure_ascii=False)
+            writer.writerow([record[column] for column in columns])
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():  # 행이 없을 때 헤더만
+        yield buffer.getvalue().encode("utf-8")
+
+
+class _ChunkSink:
+    """ParquetWriter 출력을 받아 두었다가 배치마다 꺼내 가는 쓰기 전용 파일 객체"""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def take(self) -> bytes:
+        data, self._chunks = b"".join(self._chunks), []
+        return data
+
+
+def _parquet_chunks(batches: Iterator[List[Dict]], include_data: bool) -> Iterator[bytes]:
+    fields = [
+        pyarrow.field(column, pyarrow.int64() if column == "snapshot_id"
+                      else pyarrow.float64() if column in _REAL_COLUMNS else pyarrow.string())
+        for column in EXPORT_COLUMNS
+    ]
+    if include_data:
+        fields.append(pyarrow.field("data", pyarrow.string()))
+    schema = pyarrow.schema(fields)
+    sink = _ChunkSink()
+    writer = pyarrow.parquet.ParquetWriter(pyarrow.PythonFile(sink, mode="w"), schema)
+    try:
+        for batch in batches:
+            if include_data:
+                for record in batch:
+                    record["data"] = json.dumps(record["data"], ensure_ascii=False)
+            writer.write_table(pyarrow.Table.from_pylist(batch, schema=schema))  # 배치 1개 = row group 1개
+            yield sink.take()
+    finally:
+        writer.close()
+    yield sink.take()
+
+
+def export_history(path: str, fmt: str = "ndjson", airports: Optional[List[str]] = None,
+                   since: Optional[str] = None, until: Optional[str] = None, include_data: bool = True,
+                   batch_size: int = HISTORY_EXPORT_BATCH_SIZE) -> Iterator[bytes]:
+    """
+    내보내기 바이트 조각 이터레이터. 형식/시각 오류는 호출 즉시 ValueError (스트리밍 시작 전).
+    since/until 은 ISO 또는 기상청 표시 시각 (시간대 없으면 KST).
+    연결은 읽기 전용으로 따로 열고 이터레이터가 끝나면 닫습니다 (스레드풀에서 소비해도 됨).
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"invalid format: {fmt} (expected one of {', '.join(EXPORT_FORMATS)})")
+    if fmt == "parquet" and pyarrow is None:
+        raise ValueError("parquet export requires pyarrow")
+    since, until = _bound(since, "since"), _bound(until, "until")
+
+    def _chunks():
+        conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True, timeout=5, check_same_thread=False)
+        try:
+            batches = iter_batches(conn, airports, since, until, include_data, max(1, batch_size))
+            if fmt == "ndjson":
+                yield from _ndjson_chunks(batches)
+            elif fmt == "csv":
+                yield from _csv_chunks(batches, include_data)
+            else:
+                yield from _parquet_chunks(batches, include_data)
+        finally:
+            conn.close()
+
+    return _chunks()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--format", default="ndjson", choices=list(EXPORT_FORMATS))
+    parser.add_argument("--airport", action="append", help="ICAO 코드 (여러 번 지정 가능)")
+    parser.add_argument("--since", help="관측 시각 하한 (포함)")
+    parser.add_argument("--until", help="관측 시각 상한 (제외)")
+    parser.add_argument("--no-data", action="store_true", help="원본 항목(data) 열 제외")
+    parser.add_argument("--batch-size", type=int, default=HISTORY_EXPORT_BATCH_SIZE)
+    parser.add_argument("-o", "--output", help="출력 파일 (기본: 표준 출력)")
+    args = parser.parse_args()
+
+    import database  # 스키마/마이그레이션 보장
+    try:
+        chunks = export_history(database.DATABASE_PATH, args.format, args.airport, args.since, args.until,
+                                include_data=not args.no_data, batch_size=args.batch_size)
+    except ValueError as e:
+        parser.error(str(e))
+
+    out = open(args.output, "wb") if args.output else sys.stdout.buffer
+    written = 0
+    try:
+        for chunk in chunks:
+            out.write(chunk)
+            written += len(chunk)
+    finally:
+        if args.output:
+            out.close()
+    if args.output:
+        print(f"📤 내보내기 완료: {args.output} ({written:,} bytes)")
+
+
+if __name__ == "__main__":
+    main()
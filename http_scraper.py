@@ -0,0 +1,228 @@
+"""
+브라우저 없이 AMO 페이지를 가져와 파싱하는 HTTP 엔진.
+Playwright의 page.evaluate 스크립트와 같은 결과를 내도록 맞춰 두었고,
+검증에 실패하면 호출 측(scraper.py)이 Playwright로 재시도합니다.
+"""
+import os
+import re
+import asyncio
+import logging
+from typing import List, Dict, Optional
+
+import httpx
+from bs4 import BeautifulSoup
+
+from metrics import metrics
+from observation_normalizer import ICON_MAP
+
+logger = logging.getLogger("http_scraper")
+
+# 벤치마크(bench/replay_server.py) 등에서 로컬 서버로 바꿀 수 있도록 환경 변수로 덮어쓰기 가능
+AMO_BASE_URL = os.getenv("AMO_BASE_URL", "https://amo.kma.go.kr").rstrip("/")
+AMO_MAIN_URL = AMO_BASE_URL + "/"
+AMO_FORECAST_URL = AMO_BASE_URL + "/weather/airport.do?icaoCode={icao}"
+
+HTTP_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+        "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+    ),
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "ko-KR,ko;q=0.9,en;q=0.8",
+}
+
+ICAO_RE = re.compile(r"^[A-Z]{4}$")
+
+# -----------------------------------------------------------------------------
+# 공용 HTTP 클라이언트 (커넥션 풀 재사용)
+# -----------------------------------------------------------------------------
+_client: Optional[httpx.AsyncClient] = None
+_client_loop = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    global _client, _client_loop
+    loop = asyncio.get_running_loop()
+    if _client is None or _client.is_closed or _client_loop is not loop:
+        _client = httpx.AsyncClient(
+            headers=HTTP_HEADERS,
+            timeout=httpx.Timeout(15.0, connect=5.0),
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+            follow_redirects=True,
+        )
+        _client_loop = loop
+    return _client
+
+
+async def close_http_client():
+    global _client, _client_loop
+    if _client is not None:
+        client, _client, _client_loop = _client, None, None
+        try:
+            await client.aclose()
+        except Exception:
+            pass
+
+
+async def fetch_html(url: str) -> str:
+    response = await get_http_client().get(url)
+    response.raise_for_status()
+    return response.text
+
+
+# -----------------------------------------------------------------------------
+# 파서 (순수 함수: 저장된 HTML로도 동작)
+# -----------------------------------------------------------------------------
+def _text(el) -> str:
+    """textContent.trim() 대응"""
+    return el.get_text().strip() if el is not None else ""
+
+
+def _inner_text(el) -> str:
+    """innerText.trim() 근사 (연속 공백을 하나로)"""
+    return re.sub(r"\s+", " ", el.get_text(" ")).strip() if el is not None else ""
+
+
+def _parse_condition(item) -> tuple:
+    weather_elem = item.select_one(".main_air_wthr")
+    icon_span = weather_elem.select_one("span") if weather_elem is not None else None
+    icon_class = " ".join(icon_span.get("class", [])) if icon_span is not None else ""
+
+    blind = weather_elem.select_one(".blind, .sr-only") if weather_elem is not None else None
+    blind_text = _text(blind)
+    if blind_text:
+        condition = blind_text
+    else:
+        raw_text = _text(weather_elem)
+        if "체감" in raw_text or not raw_text:
+            condition = next((ICON_MAP[c] for c in icon_class.split(" ") if c in ICON_MAP), None)
+            if condition is None:
+                condition = re.sub(r"체감.*", "", raw_text).strip() or "맑음"
+        else:
+            condition = raw_text
+
+    if condition in ("자동관측", "-"):
+        air_text = item.select_one(".main_air_text")
+        if air_text is not None:
+            nodes = list(air_text.children)
+            for i, node in enumerate(nodes):
+                if getattr(node, "name", None) == "br" and i + 1 < len(nodes):
+                    nxt = nodes[i + 1]
+                    next_text = (nxt.get_text() if hasattr(nxt, "get_text") else str(nxt)).strip()
+                    if next_text and next_text != "자동관측":
+                        condition = next_text
+                        break
+
+    if condition == "자동관측" or not condition:
+        condition = "-"
+    return condition, icon_class
+
+
+def parse_airport_list(html: str) -> List[Dict]:
+    """AMO 메인 페이지의 li.ca-item 목록을 scrape_airport_weather와 같은 형식으로 변환합니다."""
+    soup = BeautifulSoup(html, "html.parser")
+    results = []
+    seen = set()
+    for item in soup.select("li.ca-item"):
+        name_elem = item.select_one(".main_air_name")
+        if name_elem is None:
+            continue
+        code = _text(item.select_one(".main_air_name span"))
+        if not code or code in seen:
+            continue
+        first = name_elem.contents[0] if name_elem.contents else ""
+        name = (first.get_text() if hasattr(first, "get_text") else str(first)).strip()
+        seen.add(code)
+
+        condition, icon_class = _parse_condition(item)
+        temp = _text(item.select_one(".main_air_text b"))
+
+        info = {}
+        for li in item.select(".main_air_info ul li"):
+            text = _text(li)
+            for label, key in (("풍향", "wind_dir"), ("풍속", "wind_speed"), ("시정", "visibility"),
+                               ("운고", "cloud"), ("일강수", "rain")):
+                if label in text:
+                    info[key] = text.replace(label, "", 1).strip()
+
+        results.append({
+            "name": name, "code": code, "condition": condition, "iconClass": icon_class, "temp": temp,
+            "wind_dir": info.get("wind_dir", ""),
+            "wind_speed": info.get("wind_speed", ""),
+            "visibility": info.get("visibility", ""),
+            "cloud": info.get("cloud", ""),
+            "rain": info.get("rain", ""),
+            "time": _text(item.select_one(".info_time")),
+        })
+    return results
+
+
+def parse_forecast_page(html: str) -> List[Dict]:
+    """airport.do 페이지의 3일 예보(.ts-daily-item)를 파싱합니다."""
+    soup = BeautifulSoup(html, "html.parser")
+    results = []
+    for day in soup.select(".ts-daily-item")[:3]:
+        date_text = _inner_text(day.select_one(".ts-daily-head h3"))
+        hourly = []
+        for hour in day.select(".ts-hourly-item"):
+            lis = hour.select("li")
+            if len(lis) < 8:
+                continue
+            wicon = lis[2].select_one(".ts-wicon")
+            hourly.append({
+                "time": _inner_text(lis[1]),
+                "condition": _inner_text(wicon) or _inner_text(lis[2]).replace("날씨", "").strip(),
+                "temp": _inner_text(lis[3]),
+                "wind_dir": _inner_text(lis[4]),
+                "wind_speed": _inner_text(lis[5]),
+                "cloud": _inner_text(lis[6]),
+                "visibility": _inner_text(lis[7]),
+            })
+        results.append({"date": date_text, "forecasts": hourly})
+    return results
+
+
+# -----------------------------------------------------------------------------
+# 검증
+# -----------------------------------------------------------------------------
+def is_valid_airport_list(data: List[Dict]) -> bool:
+    if not data:
+        return False
+    return all(ICAO_RE.match(item.get("code", "")) and item.get("name") for item in data)
+
+
+def is_valid_forecast(days: List[Dict]) -> bool:
+    return bool(days) and any(day.get("forecasts") for day in days)
+
+
+# -----------------------------------------------------------------------------
+# 수집 (검증 실패 시 None 반환 → Playwright 폴백)
+# -----------------------------------------------------------------------------
+async def fetch_airport_list() -> Optional[List[Dict]]:
+    try:
+        with metrics.span("http_fetch", page="amo_main"):
+            html = await fetch_html(AMO_MAIN_URL)
+        with metrics.span("parse", page="amo_main"):
+            data = parse_airport_list(html)
+    except Exception as e:
+        logger.warning("HTTP airport list fetch failed: %s", e)
+        return None
+    if not is_valid_airport_list(data):
+        logger.warning("HTTP airport list failed validation (items=%s)", len(data))
+        return None
+    return data
+
+
+async def fetch_forecast(icao: str) -> Optional[List[Dict]]:
+    try:
+        with metrics.span("http_fetch", page="amo_forecast", airport=icao):
+            html = await fetch_html(AMO_FORECAST_URL.format(icao=icao))
+        with metrics.span("parse", page="amo_forecast", airport=icao):
+            days = parse_forecast_page(html)
+    except Exception as e:
+        logger.warning("HTTP forecast fetch failed for %s: %s", icao, e)
+        return None
+    if not is_valid_forecast(days):
+        logger.warning("HTTP forecast failed validation for %s", icao)
+        return None
+    return days
@@ -0,0 +1,104 @@
+"""
+키별 비동기 캐시 (예보: ICAO별, 특보: 단일 키).
+- TTL 안이면 캐시 반환, 지나면 loader로 다시 수집
+- 같은 키의 동시 요청은 진행 중인 수집 1개를 공유 (싱글 플라이트)
+- max_entries를 넘으면 가장 오래 쓰이지 않은 키부터 제거 (LRU)
+- 수집 실패/빈 결과면 이전 값을 유지하고, error_ttl 동안은 다시 수집하지 않음
+"""
+import time
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+from metrics import metrics
+
+logger = logging.getLogger("keyed_cache")
+
+metrics.describe("keyed_cache_requests_total", "Keyed cache lookups by cache and result (hit/miss/expired/coalesced)")
+metrics.describe("keyed_cache_evictions_total", "Keyed cache LRU evictions")
+
+
+class _Entry:
+    __slots__ = ("value", "fetched_at", "expires_at")
+
+    def __init__(self, value, fetched_at: float, expires_at: float):
+        self.value = value
+        self.fetched_at = fetched_at
+        self.expires_at = expires_at
+
+
+class AsyncKeyedCache:
+    def __init__(self, name: str, ttl: float, max_entries: int = 128, error_ttl: float = 60):
+        self.name = name
+        self.ttl = ttl
+        self.max_entries = max(1, max_entries)
+        self.error_ttl = error_ttl
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def peek(self, key: Hashable) -> Optional[_Entry]:
+        """LRU 순서를 바꾸지 않고 현재 항목을 돌려줍니다(없으면 None)."""
+        return self._entries.get(key)
+
+    def put(self, key: Hashable, value: Any, now: Optional[float] = None):
+        """수집 결과를 직접 넣습니다(백그라운드 워밍용)."""
+        now = time.time() if now is None else now
+        self._entries[key] = _Entry(value, now, now + self.ttl)
+        self._entries.move_to_end(key)
+        self._evict()
+
+    def _evict(self):
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            metrics.inc("keyed_cache_evictions_total", cache=self.name)
+
+    async def get(self, key: Hashable, loader: Callable[[], Awaitable]) -> Any:
+        """캐시 값 또는 (공유된) 수집 결과. 클라이언트가 끊겨도 진행 중인 수집은 취소되지 않습니다."""
+        entry = self._entries.get(key)
+        if entry is not None and time.time() < entry.expires_at:
+            self._entries.move_to_end(key)
+            metrics.inc("keyed_cache_requests_total", cache=self.name, result="hit")
+            return entry.value
+
+        task = self._inflight.get(key)
+        if task is None:
+            metrics.inc("keyed_cache_requests_total", cache=self.name, result="expired" if entry else "miss")
+            task = self._inflight[key] = asyncio.create_task(self._load(key, loader))
+        else:
+            metrics.inc("keyed_cache_requests_total", cache=self.name, result="coalesced")
+        return await asyncio.shield(task)
+
+    async def _load(self, key: Hashable, loader: Callable[[], Awaitable]) -> Any:
+        try:
+            with metrics.span("keyed_cache_load", cache=self.name):
+                value = await loader()
+        except Exception as e:
+            logger.warning("%s[%s] load failed: %s", self.name, key, e)
+            value = None
+        finally:
+            self._inflight.pop(key, None)
+
+        if value:
+            self.put(key, value)
+            return value
+
+        # 실패/빈 결과: 이전 값(만료됐더라도)을 유지하고 error_ttl 동안 재수집을 막음
+        now = time.time()
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = _Entry(value if value is not None else [], 0.0, now + self.error_ttl)
+            self._entries[key] = entry
+        else:
+            entry.expires_at = now + self.error_ttl
+        self._entries.move_to_end(key)
+        self._evict()
+        return entry.value
+
+    def cancel_all(self):
+        """종료 시 진행 중인 수집을 취소합니다."""
+        for task in list(self._inflight.values()):
+            task.cancel()
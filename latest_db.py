@@ -0,0 +1,178 @@
+"""
+스크래퍼 cron(scripts/run_scraper_to_db.py)이 저장한 최신 데이터를 읽는 DB 접근 계층.
+- Postgres(Supabase, 운영): DATABASE_URL=postgresql://...  → psycopg2 ThreadedConnectionPool
+- SQLite(로컬):             DATABASE_URL=sqlite:///weather_latest.db → 스레드별 연결 재사용
+테이블: weather_latest(단일 행: data, special_reports, updated_at), airport_forecast_3day(공항별 3일 예보)
+updated_at()만 먼저 조회해 바뀌었을 때만 본문을 읽도록 쓰세요.
+메서드는 동기 함수입니다 (app.py에서는 run_in_executor로 호출).
+"""
+import os
+import json
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+LATEST_DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///weather_latest.db")
+LATEST_DB_POOL_SIZE = int(os.getenv("LATEST_DB_POOL_SIZE", "4"))
+
+_SQLITE_SCHEMA = (
+    '''
+    CREATE TABLE IF NOT EXISTS weather_latest (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        data TEXT NOT NULL DEFAULT '[]',
+        special_reports TEXT NOT NULL DEFAULT '[]',
+        updated_at TEXT NOT NULL
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS airport_forecast_3day (
+        airport_code TEXT PRIMARY KEY,
+        data TEXT NOT NULL DEFAULT '[]',
+        updated_at TEXT NOT NULL
+    )
+    ''',
+)
+
+
+def to_epoch(value) -> float:
+    """DB의 updated_at(datetime 또는 ISO/SQLite 문자열, 시간대 없으면 UTC) → epoch 초"""
+    if value is None:
+        return 0.0
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+def _json(value):
+    # Postgres JSONB는 이미 파이썬 객체, SQLite TEXT는 문자열
+    return json.loads(value) if isinstance(value, (str, bytes)) else value
+
+
+class _PostgresLatestDB:
+    param = "%s"
+
+    def __init__(self, url: str, pool_size: int = LATEST_DB_POOL_SIZE):
+        from psycopg2.pool import ThreadedConnectionPool
+        self._pool = ThreadedConnectionPool(1, max(1, pool_size), dsn=url)
+
+    @contextmanager
+    def _cursor(self):
+        conn = self._pool.getconn()
+        try:
+            with conn.cursor() as cur:
+                yield cur
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            self._pool.putconn(conn)
+
+    def close(self):
+        self._pool.closeall()
+
+
+class _SQLiteLatestDB:
+    param = "?"
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        # close()에서 모든 스레드(app.py run_in_executor 워커 포함)의 연결을 닫기 위해 보관
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+        with self._cursor() as cur:
+            for statement in _SQLITE_SCHEMA:
+                cur.execute(statement)
+
+    @contextmanager
+    def _cursor(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            with self._connections_lock:
+                self._connections.append(conn)
+        cur = conn.cursor()
+        try:
+            yield cur
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cur.close()
+
+    def close(self):
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+        self._local = threading.local()
+
+    # cron 스크립트가 로컬 SQLite를 대상으로 실행될 때 사용
+    def save_latest(self, data: List[Dict], special_reports: List[Dict], forecasts: Dict[str, List]):
+        now = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+        with self._cursor() as cur:
+            cur.execute('''
+                INSERT INTO weather_latest (id, data, special_reports, updated_at) VALUES (1, ?, ?, ?)
+                ON CONFLICT(id) DO UPDATE SET
+                    data = excluded.data, special_reports = excluded.special_reports, updated_at = excluded.updated_at
+            ''', (json.dumps(data, ensure_ascii=False), json.dumps(special_reports, ensure_ascii=False), now))
+            cur.executemany('''
+                INSERT INTO airport_forecast_3day (airport_code, data, updated_at) VALUES (?, ?, ?)
+                ON CONFLICT(airport_code) DO UPDATE SET data = excluded.data, updated_at = excluded.updated_at
+            ''', [(code, json.dumps(days, ensure_ascii=False), now) for code, days in forecasts.items() if days])
+
+
+class _Queries:
+    """두 백엔드가 공유하는 조회 (파라미터 표기만 다름)"""
+
+    def updated_at(self) -> Optional[float]:
+        """weather_latest 변경 확인용 가벼운 조회 (행이 없으면 None)"""
+        with self._cursor() as cur:
+            cur.execute("SELECT updated_at FROM weather_latest WHERE id = 1")
+            row = cur.fetchone()
+        return to_epoch(row[0]) if row else None
+
+    def load_latest(self) -> Optional[Tuple[List[Dict], List[Dict], float]]:
+        """(data, special_reports, updated_at epoch)"""
+        with self._cursor() as cur:
+            cur.execute("SELECT data, special_reports, updated_at FROM weather_latest WHERE id = 1")
+            row = cur.fetchone()
+        if not row:
+            return None
+        return _json(row[0]) or [], _json(row[1]) or [], to_epoch(row[2])
+
+    def load_forecasts(self) -> Dict[str, List]:
+        """{ICAO: 3일 예보} 전체"""
+        with self._cursor() as cur:
+            cur.execute("SELECT airport_code, data FROM airport_forecast_3day")
+            rows = cur.fetchall()
+        return {code: _json(data) or [] for code, data in rows}
+
+    def load_forecast(self, icao: str) -> List:
+        with self._cursor() as cur:
+            cur.execute(f"SELECT data FROM airport_forecast_3day WHERE airport_code = {self.param}", (icao,))
+            row = cur.fetchone()
+        return (_json(row[0]) or []) if row else []
+
+
+class PostgresLatestDB(_Queries, _PostgresLatestDB):
+    pass
+
+
+class SQLiteLatestDB(_Queries, _SQLiteLatestDB):
+    pass
+
+
+def open_latest_db(url: str = LATEST_DATABASE_URL):
+    if url.startswith("sqlite:///"):
+        return SQLiteLatestDB(url[len("sqlite:///"):])
+    if url.startswith(("postgres://", "postgresql://")):
+        return PostgresLatestDB(url)
+    raise ValueError(f"지원하지 않는 DATABASE_URL: {url.split(':', 1)[0]}")
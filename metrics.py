@@ -0,0 +1,188 @@
+"""
+가벼운 계측 레이어 (외부 의존성 없음).
+- span(): 구간 시간 측정 context manager → <name>_seconds 히스토그램 + 이벤트 기록
+- inc(): 카운터, observe(): 히스토그램, set_gauge(): 게이지
+- 출력: JSON lines (구간 이벤트) 또는 Prometheus text 스냅샷
+"""
+import os
+import json
+import time
+import threading
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, Optional, Tuple
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+# 사이클이 끝날 때 이벤트/스냅샷을 기록할 파일 (비어 있으면 기록 안 함)
+METRICS_JSONL_PATH = os.getenv("METRICS_JSONL_PATH", "")
+METRICS_PROM_PATH = os.getenv("METRICS_PROM_PATH", "")
+# 장기 실행 프로세스(app.py)에서 이벤트가 무한히 쌓이지 않도록 최근 N개만 보관
+METRICS_MAX_EVENTS = int(os.getenv("METRICS_MAX_EVENTS", "5000"))
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items() if v is not None))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(key: LabelKey, extra: Optional[Dict] = None) -> str:
+    pairs = list(key) + sorted((extra or {}).items())
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(str(v))}"' for k, v in pairs) + "}"
+
+
+class _Histogram:
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.sum += value
+        self.count += 1
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+
+
+class Metrics:
+    def __init__(self, prefix: str = "airport"):
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._counters: Dict[Tuple[str, LabelKey], float] = {}
+            self._gauges: Dict[Tuple[str, LabelKey], float] = {}
+            self._histograms: Dict[Tuple[str, LabelKey], _Histogram] = {}
+            self._help: Dict[str, str] = {}
+            self.events: deque = deque(maxlen=METRICS_MAX_EVENTS)
+            self.cycle_id: Optional[str] = None
+
+    # --- 기록 ---
+    def inc(self, name: str, value: float = 1, **labels):
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def set_gauge(self, name: str, value: float, **labels):
+        with self._lock:
+            self._gauges[(name, _label_key(labels))] = value
+
+    def observe(self, name: str, value: float, **labels):
+        key = (name, _label_key(labels))
+        with self._lock:
+            hist = self._histograms.get(key)
+            if hist is None:
+                hist = self._histograms[key] = _Histogram()
+            hist.observe(value)
+
+    def describe(self, name: str, help_text: str):
+        self._help[name] = help_text
+
+    @contextmanager
+    def span(self, name: str, **labels):
+        """with metrics.span("navigate", airport="RKSI"): ... — async 코드 안에서도 그대로 사용"""
+        started = time.perf_counter()
+        ok = True
+        try:
+            yield
+        except BaseException:
+            ok = False
+            self.inc(f"{name}_errors_total", **labels)
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            self.observe(f"{name}_seconds", elapsed, **labels)
+            event = {"ts": time.time(), "span": name, "seconds": round(elapsed, 6), "ok": ok}
+            if self.cycle_id:
+                event["cycle"] = self.cycle_id
+            event.update({k: v for k, v in labels.items() if v is not None})
+            with self._lock:
+                self.events.append(event)
+
+    @contextmanager
+    def cycle(self, name: str = "cycle"):
+        """한 수집 사이클. 이벤트 목록을 비우고 cycle id를 붙인 뒤 전체 시간을 측정합니다."""
+        with self._lock:
+            self.events.clear()
+            self.cycle_id = time.strftime("%Y%m%dT%H%M%S")
+        try:
+            with self.span(name):
+                yield
+        finally:
+            self.flush()
+            self.cycle_id = None
+
+    # --- 출력 ---
+    def json_lines(self) -> str:
+        with self._lock:
+            return "".join(json.dumps(e, ensure_ascii=False) + "\n" for e in self.events)
+
+    def prometheus_text(self) -> str:
+        lines = []
+        with self._lock:
+            counters = sorted(self._counters.items())
+            gauges = sorted(self._gauges.items())
+            histograms = sorted(self._histograms.items(), key=lambda kv: kv[0])
+            help_text = dict(self._help)
+
+        def _header(name: str, kind: str, seen: set):
+            full = f"{self.prefix}_{name}"
+            if full in seen:
+                return full
+            seen.add(full)
+            if name in help_text:
+                lines.append(f"# HELP {full} {help_text[name]}")
+            lines.append(f"# TYPE {full} {kind}")
+            return full
+
+        seen: set = set()
+        for (name, key), value in counters:
+            full = _header(name, "counter", seen)
+            lines.append(f"{full}{_format_labels(key)} {value:g}")
+        for (name, key), value in gauges:
+            full = _header(name, "gauge", seen)
+            lines.append(f"{full}{_format_labels(key)} {value:g}")
+        for (name, key), hist in histograms:
+            full = _header(name, "histogram", seen)
+            for bound, count in zip(hist.buckets, hist.counts):
+                lines.append(f"{full}_bucket{_format_labels(key, {'le': f'{bound:g}'})} {count}")
+            lines.append(f"{full}_bucket{_format_labels(key, {'le': '+Inf'})} {hist.count}")
+            lines.append(f"{full}_sum{_format_labels(key)} {hist.sum:.6f}")
+            lines.append(f"{full}_count{_format_labels(key)} {hist.count}")
+        return "\n".join(lines) + "\n"
+
+    def summary(self) -> str:
+        """로그용: 이번 사이클 구간별 합계 (예: "browser_launch 1.20s, navigate 8.31s")"""
+        totals: Dict[str, float] = {}
+        with self._lock:
+            for e in self.events:
+                totals[e["span"]] = totals.get(e["span"], 0.0) + e["seconds"]
+        return ", ".join(f"{name} {sec:.2f}s" for name, sec in sorted(totals.items(), key=lambda kv: -kv[1]))
+
+    def flush(self):
+        """METRICS_JSONL_PATH / METRICS_PROM_PATH 가 설정돼 있으면 파일로 기록합니다."""
+        try:
+            if METRICS_JSONL_PATH:
+                with open(METRICS_JSONL_PATH, "a", encoding="utf-8") as f:
+                    f.write(self.json_lines())
+            if METRICS_PROM_PATH:
+                tmp = METRICS_PROM_PATH + ".tmp"
+                with open(tmp, "w", encoding="utf-8") as f:
+                    f.write(self.prometheus_text())
+                os.replace(tmp, METRICS_PROM_PATH)
+        except OSError:
+            pass
+
+
+metrics = Metrics()
@@ -0,0 +1,123 @@
+"""
+관측 표시 문자열 → 숫자 값 변환 (히스토리 DB의 타입 컬럼용).
+  temp "-6.5℃" → -6.5 (°C)            wind_speed "13 kt" → 13.0 (kt, m/s·km/h는 환산)
+  visibility "10 km ↑" → 10000 (m)     cloud(운고) "2,800 ft" → 2800 (ft)
+  rain "0.1 ㎜" → 0.1 (mm)             time "2026년 1월 29일(목) 22:30(KST)" → "2026-01-29T13:30:00Z" (UTC)
+  condition "구름많음" → 그대로 (집계용 범주), "체감(-6.4℃)" → 아이콘(iconClass/iconCode)의 범주 또는 None
+값이 없거나 "-" 이면 None. 스크래퍼 원본 항목(temp, wind_speed ...)과
+프론트엔드가 저장한 항목(current.temperature 등) 모두 받습니다.
+"""
+import re
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional
+
+KST = timezone(timedelta(hours=9))
+
+_NUMBER_RE = re.compile(r"-?\d+(?:\.\d+)?")
+_KOREAN_TIME_RE = re.compile(
+    r"(\d{4})년\s*(\d{1,2})월\s*(\d{1,2})일[^\d]*?(\d{1,2}):(\d{2})(?::(\d{2}))?"
+)
+
+# 단위 → 기준 단위 배율
+_WIND_TO_KT = (("m/s", 1.943844), ("km/h", 0.539957), ("kt", 1.0), ("kn", 1.0))
+_DISTANCE_TO_M = (("km", 1000.0), ("m", 1.0))
+_LENGTH_TO_FT = (("ft", 1.0), ("m", 3.28084))
+
+# 아이콘 클래스 → 표시 범주 (스크래퍼의 ICON_MAP과 같음, http_scraper 도 사용)
+ICON_MAP = {
+    "mtph1": "맑음", "mtph01": "맑음", "mtph21": "맑음",
+    "mtph2": "구름조금", "mtph02": "구름조금", "mtph22": "구름조금",
+    "mtph3": "구름많음", "mtph03": "구름많음", "mtph23": "구름많음",
+    "mtph4": "흐림", "mtph04": "흐림", "mtph24": "흐림",
+    "mtph15": "맑음", "wi1": "맑음", "wi01": "맑음", "wi21": "맑음",
+    "wi2": "구름조금", "wi02": "구름조금", "wi22": "구름조금",
+    "wi3": "구름많음", "wi03": "구름많음", "wi23": "구름많음",
+    "wi4": "흐림", "wi04": "흐림", "wi24": "흐림",
+}
+# 프론트엔드 저장 항목의 current.iconCode → 표시 범주
+_ICON_CODES = {"sunny": "맑음", "cloudy": "흐림", "rain": "비", "rainy": "비", "snow": "눈", "snowy": "눈", "mist": "안개"}
+_ICON_CATEGORIES = {**ICON_MAP, **_ICON_CODES}
+_FEELS_LIKE_RE = re.compile(r"체감.*")
+
+TYPED_COLUMNS = ("temp_c", "wind_kt", "visibility_m", "ceiling_ft", "rain_mm", "observed_at", "condition")
+
+
+def _number(text) -> Optional[float]:
+    if text is None:
+        return None
+    match = _NUMBER_RE.search(str(text).replace(",", ""))
+    return float(match.group()) if match else None
+
+
+def _with_unit(text, units, default: float = 1.0) -> Optional[float]:
+    value = _number(text)
+    if value is None:
+        return None
+    lowered = str(text).lower()
+    for unit, factor in units:
+        if unit in lowered:
+            return round(value * factor, 2)
+    return round(value * default, 2)
+
+
+def parse_temperature(text) -> Optional[float]:
+    return _number(text)
+
+
+def parse_wind_kt(text) -> Optional[float]:
+    return _with_unit(text, _WIND_TO_KT)
+
+
+def parse_visibility_m(text) -> Optional[float]:
+    return _with_unit(text, _DISTANCE_TO_M)
+
+
+def parse_ceiling_ft(text) -> Optional[float]:
+    return _with_unit(text, _LENGTH_TO_FT)
+
+
+def parse_rain_mm(text) -> Optional[float]:
+    # "㎜" 한 글자 단위도 mm로 취급
+    return _number(text)
+
+
+def parse_condition(text, icon=None) -> Optional[str]:
+    """표시 문자열이 체감온도("체감(-6.4℃)")이거나 비어 있으면 스크래퍼처럼 아이콘으로 범주를 정함"""
+    text = (text or "").strip()
+    if "체감" in text or not text:
+        mapped = next((_ICON_CATEGORIES[c] for c in str(icon or "").split() if c in _ICON_CATEGORIES), None)
+        text = mapped or _FEELS_LIKE_RE.sub("", text).strip()
+    return None if text in ("", "-") else text
+
+
+def parse_observed_at(text) -> Optional[str]:
+    """KST 표시 시각 또는 ISO 문자열 → UTC "YYYY-MM-DDTHH:MM:SSZ" (정렬/범위 비교용)"""
+    if not text:
+        return None
+    match = _KOREAN_TIME_RE.search(str(text))
+    try:
+        if match:
+            year, month, day, hour, minute, second = (int(g or 0) for g in match.groups())
+            observed = datetime(year, month, day, hour, minute, second, tzinfo=KST)
+        else:
+            observed = datetime.fromisoformat(str(text).replace("Z", "+00:00"))
+            if observed.tzinfo is None:
+                observed = observed.replace(tzinfo=KST)
+    except ValueError:
+        return None
+    return observed.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def normalize_observation(item: Dict, fallback_time: Optional[str] = None) -> Dict:
+    """항목 1개 → {temp_c, wind_kt, visibility_m, ceiling_ft, rain_mm, observed_at, condition}"""
+    current = item.get("current") if isinstance(item.get("current"), dict) else {}
+    return {
+        "temp_c": parse_temperature(item.get("temp") or current.get("temperature")),
+        "wind_kt": parse_wind_kt(item.get("wind_speed")),
+        "visibility_m": parse_visibility_m(item.get("visibility")),
+        "ceiling_ft": parse_ceiling_ft(item.get("cloud")),
+        "rain_mm": parse_rain_mm(item.get("rain")),
+        "observed_at": parse_observed_at(item.get("time")) or parse_observed_at(fallback_time),
+        "condition": parse_condition(item.get("condition") or current.get("condition"),
+                                     item.get("iconClass") or current.get("iconCode")),
+    }
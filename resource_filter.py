@@ -0,0 +1,125 @@
+"""
+Playwright 요청 차단 레이어.
+스크래핑에 필요 없는 이미지/폰트/스타일시트/분석 스크립트를 page.route 로 막아
+wait_for_selector 까지 걸리는 시간과 대역폭을 줄입니다.
+"""
+import os
+import logging
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+logger = logging.getLogger("resource_filter")
+
+RESOURCE_FILTER_ENABLED = os.getenv("RESOURCE_FILTER_ENABLED", "1") not in ("0", "false", "False")
+
+# 대상 페이지별 허용 목록
+# - types: 허용할 Playwright resource_type
+# - hosts: 허용할 호스트(접미사 일치). None 이면 호스트 제한 없음
+RESOURCE_PROFILES = {
+    # AMO 메인 (li.ca-item 목록)
+    "amo_main": {
+        "types": {"document", "script", "xhr", "fetch"},
+        "hosts": ("kma.go.kr",),
+    },
+    # AMO 공항 상세 (airport.do 타임 슬라이더)
+    "amo_forecast": {
+        "types": {"document", "script", "xhr", "fetch"},
+        "hosts": ("kma.go.kr",),
+    },
+    # 기상청 특보 (.cmp-weather-cmt-txt-box)
+    "special_report": {
+        "types": {"document", "script", "xhr", "fetch"},
+        "hosts": ("weather.go.kr", "kma.go.kr"),
+    },
+}
+
+# 로컬 리플레이 서버(bench/replay_server.py)는 항상 허용
+LOCAL_HOSTS = ("127.0.0.1", "localhost")
+
+# 호스트 허용 여부와 무관하게 항상 차단
+BLOCKED_HOST_KEYWORDS = (
+    "google-analytics", "googletagmanager", "doubleclick", "googlesyndication",
+    "facebook", "naver.net/wcslog", "wcs.naver", "daumcdn.net/tiara", "hotjar",
+)
+
+
+class ResourceFilterStats:
+    """
+    차단/허용 카운터. 차단된 요청은 내려받지 않으므로 바이트 수를 알 수 없고,
+    허용된 응답의 Content-Length 합계만 집계합니다.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.blocked_requests: Dict[str, int] = {}
+        self.allowed_requests: Dict[str, int] = {}
+        self.allowed_bytes = 0
+
+    def record_blocked(self, resource_type: str):
+        self.blocked_requests[resource_type] = self.blocked_requests.get(resource_type, 0) + 1
+
+    def record_allowed(self, resource_type: str):
+        self.allowed_requests[resource_type] = self.allowed_requests.get(resource_type, 0) + 1
+
+    def report(self) -> Dict:
+        return {
+            "blocked_requests": sum(self.blocked_requests.values()),
+            "blocked_by_type": dict(self.blocked_requests),
+            "allowed_requests": sum(self.allowed_requests.values()),
+            "allowed_by_type": dict(self.allowed_requests),
+            "allowed_bytes": self.allowed_bytes,
+        }
+
+    def format_report(self) -> str:
+        r = self.report()
+        by_type = ", ".join(f"{t} {n}" for t, n in sorted(r["blocked_by_type"].items())) or "-"
+        return (
+            f"차단 {r['blocked_requests']}건 ({by_type}) / "
+            f"허용 {r['allowed_requests']}건, {r['allowed_bytes'] / 1024:.1f}KB"
+        )
+
+
+stats = ResourceFilterStats()
+
+
+def is_allowed(profile: Dict, url: str, resource_type: str) -> bool:
+    lowered = url.lower()
+    if any(keyword in lowered for keyword in BLOCKED_HOST_KEYWORDS):
+        return False
+    if resource_type not in profile["types"]:
+        return False
+    hosts = profile.get("hosts")
+    if hosts is None:
+        return True
+    host = (urlparse(url).hostname or "").lower()
+    if host in LOCAL_HOSTS:
+        return True
+    return any(host == h or host.endswith("." + h) for h in hosts)
+
+
+async def apply_resource_filter(page, profile_name: str, filter_stats: Optional[ResourceFilterStats] = None):
+    """page 에 profile_name 허용 목록을 적용합니다. RESOURCE_FILTER_ENABLED=0 이면 아무것도 하지 않습니다."""
+    if not RESOURCE_FILTER_ENABLED:
+        return
+    profile = RESOURCE_PROFILES[profile_name]
+    counters = filter_stats or stats
+
+    async def _handle(route):
+        request = route.request
+        if is_allowed(profile, request.url, request.resource_type):
+            counters.record_allowed(request.resource_type)
+            await route.continue_()
+        else:
+            counters.record_blocked(request.resource_type)
+            await route.abort()
+
+    def _on_response(response):
+        try:
+            counters.allowed_bytes += int(response.headers.get("content-length") or 0)
+        except ValueError:
+            pass
+
+    await page.route("**/*", _handle)
+    page.on("response", _on_response)
@@ -0,0 +1,209 @@
+"""
+weather_history.db 보존 정책 (유지보수 작업).
+- 관측 시각(observed_at)이 HISTORY_RAW_RETENTION_DAYS 보다 오래된 원본 행을
+  공항별 시간(UTC 시) / 일(KST 날짜) 집계로 합친 뒤 삭제 (키프레임 그룹 단위, 아래 참고)
+  (기온 최소/최대/평균, 풍속 최대, 시정 최소, 가장 많았던 날씨 등 — database.py의 weather_hourly/weather_daily)
+- 시간 집계는 HISTORY_HOURLY_RETENTION_DAYS 까지만 보관, 일 집계는 계속 보관
+- 삭제 후 incremental vacuum으로 파일 크기 회수 (기존 파일은 최초 1회 auto_vacuum=INCREMENTAL 로 전환하며 VACUUM)
+델타 스냅샷(database.py)은 키프레임부터 복원하므로, 키프레임 그룹(키프레임 + 뒤따르는 델타)의
+모든 행이 cutoff 이전일 때만 그룹의 행과 스냅샷을 통째로 삭제합니다. cutoff에 걸친 그룹은
+다음 실행까지 원본으로 남고, observed_at이 없는 행이 있는 그룹은 삭제하지 않습니다.
+
+사용법:
+  python retention.py              # 1회 실행
+  python retention.py --dry-run    # 집계/삭제 대상만 출력
+주기 실행: app.py 의 HISTORY_RETENTION_INTERVAL_HOURS (0이면 비활성)
+"""
+import os
+import json
+import sqlite3
+import argparse
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional
+
+HISTORY_RAW_RETENTION_DAYS = int(os.getenv("HISTORY_RAW_RETENTION_DAYS", "30"))
+HISTORY_HOURLY_RETENTION_DAYS = int(os.getenv("HISTORY_HOURLY_RETENTION_DAYS", "365"))
+# 한 번에 회수할 최대 페이지 수 (0이면 전부)
+HISTORY_VACUUM_PAGES = int(os.getenv("HISTORY_VACUUM_PAGES", "2000"))
+
+KST = timezone(timedelta(hours=9))
+
+# 집계 단위별 버킷 식 (observed_at: UTC "YYYY-MM-DDTHH:MM:SSZ")
+_BUCKETS = {
+    "weather_hourly": "strftime('%Y-%m-%dT%H:00:00Z', observed_at)",
+    "weather_daily": "date(observed_at, '+9 hours')",
+}
+# 집계 컬럼 접두사 ↔ weather_data 타입 컬럼 (database.get_history_stats 도 사용)
+ROLLUP_STATS = (("temp", "temp_c"), ("wind", "wind_kt"), ("vis", "visibility_m"))
+_STAT_COLUMNS = [f"{prefix}_{agg}" for prefix, _ in ROLLUP_STATS for agg in ("min", "max", "sum", "count")]
+
+
+def _utc(dt: datetime) -> str:
+    return dt.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def raw_cutoff(now: Optional[datetime] = None, days: int = HISTORY_RAW_RETENTION_DAYS) -> str:
+    """원본 보관 경계. KST 자정에 맞춰 시간/일 버킷이 경계에 걸리지 않게 합니다."""
+    now = now or datetime.now(timezone.utc)
+    local = (now.astimezone(KST) - timedelta(days=days)).replace(hour=0, minute=0, second=0, microsecond=0)
+    return _utc(local)
+
+
+# 삭제 대상: 모든 행이 cutoff 이전인 키프레임 그룹의 스냅샷 (행이 없는 그룹 포함)
+_PRUNE_SNAPSHOTS_SQL = '''
+    CREATE TEMP TABLE retention_prune AS
+    WITH grouped AS (
+        SELECT id, SUM(is_keyframe) OVER (ORDER BY id) AS grp FROM snapshots
+    ),
+    kept AS (
+        SELECT DISTINCT g.grp FROM grouped g JOIN weather_data w ON w.snapshot_id = g.id
+        WHERE w.observed_at IS NULL OR w.observed_at >= ?
+    )
+    SELECT id AS snapshot_id FROM grouped WHERE grp NOT IN (SELECT grp FROM kept)
+'''
+# 삭제 대상 스냅샷의 행 (집계할 때는 키프레임이 반복 저장한 inherited 행을 빼서 관측을 한 번만 셈)
+_PRUNE_ROWS = "snapshot_id IN (SELECT snapshot_id FROM temp.retention_prune)"
+
+
+def _aggregate(conn: sqlite3.Connection, table: str) -> Dict:
+    """삭제 대상 원본 행을 SQL로 버킷별 집계 → {(airport, bucket): {컬럼: 값}}"""
+    bucket = _BUCKETS[table]
+    stat_sql = ", ".join(
+        f"MIN({col}), MAX({col}), SUM({col}), COUNT({col})" for _, col in ROLLUP_STATS
+    )
+    buckets = {}
+    for row in conn.execute(f'''
+        SELECT airport_code, {bucket}, COUNT(*), {stat_sql}
+        FROM weather_data WHERE {_PRUNE_ROWS} AND NOT inherited
+        GROUP BY 1, 2
+    '''):
+        stats = dict(zip(["samples"] + _STAT_COLUMNS, row[2:]))
+        stats["conditions"] = Counter()
+        buckets[(row[0], row[1])] = stats
+    for airport, key, condition, count in conn.execute(f'''
+        SELECT airport_code, {bucket}, condition, COUNT(*)
+        FROM weather_data WHERE {_PRUNE_ROWS} AND NOT inherited AND condition IS NOT NULL
+        GROUP BY 1, 2, 3
+    '''):
+        buckets[(airport, key)]["conditions"][condition] += count
+    return buckets
+
+
+def _merge(existing: Optional[Dict], new: Dict) -> Dict:
+    if not existing:
+        return new
+    merged = {"samples": existing["samples"] + new["samples"],
+              "conditions": existing["conditions"] + new["conditions"]}
+    for prefix, _ in ROLLUP_STATS:
+        mins = [v for v in (existing[f"{prefix}_min"], new[f"{prefix}_min"]) if v is not None]
+        maxs = [v for v in (existing[f"{prefix}_max"], new[f"{prefix}_max"]) if v is not None]
+        merged[f"{prefix}_min"] = min(mins) if mins else None
+        merged[f"{prefix}_max"] = max(maxs) if maxs else None
+        merged[f"{prefix}_sum"] = (existing[f"{prefix}_sum"] or 0) + (new[f"{prefix}_sum"] or 0)
+        merged[f"{prefix}_count"] = existing[f"{prefix}_count"] + new[f"{prefix}_count"]
+    return merged
+
+
+def dominant_condition(conditions: Counter) -> Optional[str]:
+    if not conditions:
+        return None
+    return max(conditions.items(), key=lambda kv: (kv[1], kv[0]))[0]
+
+
+def _upsert_rollups(conn: sqlite3.Connection, table: str, buckets: Dict) -> int:
+    """기존 버킷이 있으면(뒤늦게 들어온 과거 스냅샷 등) 합쳐서 저장"""
+    columns = ["samples"] + _STAT_COLUMNS
+    rows = []
+    for (airport, key), new in buckets.items():
+        current = conn.execute(
+            f"SELECT {', '.join(columns)}, condition_counts FROM {table} WHERE airport_code = ? AND bucket_start = ?",
+            (airport, key),
+        ).fetchone()
+        existing = None
+        if current:
+            existing = dict(zip(columns, current[:-1]))
+            existing["conditions"] = Counter(json.loads(current[-1] or "{}"))
+        merged = _merge(existing, new)
+        rows.append((airport, key, *(merged[c] for c in columns),
+                     json.dumps(merged["conditions"], ensure_ascii=False), dominant_condition(merged["conditions"])))
+    conn.executemany(f'''
+        INSERT OR REPLACE INTO {table}
+            (airport_code, bucket_start, {', '.join(columns)}, condition_counts, dominant_condition)
+        VALUES ({', '.join('?' * (len(columns) + 4))})
+    ''', rows)
+    return len(rows)
+
+
+def _vacuum(conn: sqlite3.Connection, pages: int) -> str:
+    if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+        # 기존 파일은 INCREMENTAL 모드로 1회 전환 (전체 VACUUM)
+        conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        conn.execute("VACUUM")
+        return "full vacuum (auto_vacuum → incremental)"
+    free = conn.execute("PRAGMA freelist_count").fetchone()[0]
+    # execute()는 pragma를 한 단계만 실행해 1페이지만 회수 → executescript로 끝까지 실행 (0 이하면 전부)
+    conn.executescript(f"PRAGMA incremental_vacuum({max(pages, 0)})")
+    freed = free - conn.execute("PRAGMA freelist_count").fetchone()[0]
+    return f"incremental vacuum ({freed} pages)"
+
+
+def apply_retention(conn: sqlite3.Connection, now: Optional[datetime] = None, dry_run: bool = False,
+                    raw_days: int = HISTORY_RAW_RETENTION_DAYS,
+                    hourly_days: int = HISTORY_HOURLY_RETENTION_DAYS,
+                    vacuum_pages: int = HISTORY_VACUUM_PAGES) -> Dict:
+    """집계 → 원본/오래된 시간 집계 삭제 → vacuum. 결과 요약 dict를 돌려줍니다."""
+    now = now or datetime.now(timezone.utc)
+    cutoff = raw_cutoff(now, raw_days)
+    hourly_cutoff = _utc(now - timedelta(days=hourly_days))
+    summary = {"raw_cutoff": cutoff, "hourly_cutoff": hourly_cutoff}
+
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        conn.execute("DROP TABLE IF EXISTS temp.retention_prune")
+        conn.execute(_PRUNE_SNAPSHOTS_SQL, (cutoff,))
+        summary["raw_rows"] = conn.execute(
+            f"SELECT COUNT(*) FROM weather_data WHERE {_PRUNE_ROWS} AND NOT inherited"
+        ).fetchone()[0]
+        for table in _BUCKETS:
+            buckets = _aggregate(conn, table)
+            summary[f"{table}_buckets"] = len(buckets) if dry_run else _upsert_rollups(conn, table, buckets)
+        if dry_run:
+            conn.rollback()
+            return summary
+
+        conn.execute(f"DELETE FROM weather_data WHERE {_PRUNE_ROWS}")
+        summary["snapshots_deleted"] = conn.execute(
+            "DELETE FROM snapshots WHERE id IN (SELECT snapshot_id FROM temp.retention_prune)"
+        ).rowcount
+        conn.execute("DROP TABLE temp.retention_prune")
+        summary["hourly_deleted"] = conn.execute(
+            "DELETE FROM weather_hourly WHERE bucket_start < ?", (hourly_cutoff,)
+        ).rowcount
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+    summary["vacuum"] = _vacuum(conn, vacuum_pages)
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dry-run", action="store_true", help="집계/삭제 대상만 출력")
+    parser.add_argument("--raw-days", type=int, default=HISTORY_RAW_RETENTION_DAYS)
+    parser.add_argument("--hourly-days", type=int, default=HISTORY_HOURLY_RETENTION_DAYS)
+    args = parser.parse_args()
+
+    import database  # 스키마/마이그레이션 보장
+    conn = sqlite3.connect(database.DATABASE_PATH, timeout=30, isolation_level=None)
+    try:
+        summary = apply_retention(conn, dry_run=args.dry_run, raw_days=args.raw_days, hourly_days=args.hourly_days)
+    finally:
+        conn.close()
+    print(f"🧹 보존 정책 {'(dry run) ' if args.dry_run else ''}완료: {json.dumps(summary, ensure_ascii=False)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,255 +1,355 @@
 import asyncio
 import json
+import hashlib
 import os
 import sys
+import time
 import psycopg2
 from urllib.parse import urlparse
-from playwright.async_api import async_playwright
 from datetime import datetime
+from browser_pool import get_browser_pool, close_browser_pool
+import http_scraper
+from resource_filter import apply_resource_filter, stats as resource_filter_stats
+from special_report_matcher import match_special_reports
+from metrics import metrics
+from fetch_scheduler import run_bounded, summarize_status, STATUS_OK, FORECAST_DEADLINE_SECONDS
+
+# 수집 엔진: "playwright"(기본) 또는 "http"(브라우저 없이 HTML 파싱, 실패 시 Playwright 폴백)
+SCRAPER_ENGINE = os.getenv("SCRAPER_ENGINE", "playwright")
+SPECIAL_REPORT_URL = os.getenv("WEATHER_BASE_URL", "https://www.weather.go.kr").rstrip("/") + "/w/special-report/overall.do"
+
+# --- 상세 예보 (airport.do) ---
+# 3일 예보 전체를 추출합니다. forecast_12h 요약도 이 결과에서 만듭니다.
+FORECAST_3DAY_JS = '''() => {
+    const dailyItems = document.querySelectorAll('.ts-daily-item');
+    const results = [];
+
+    // 조회일 포함 상위 3일만 처리
+    const targetDays = Array.from(dailyItems).slice(0, 3);
+
+    targetDays.forEach(day => {
+        const dateText = day.querySelector('.ts-daily-head h3')?.innerText.trim() || "";
+        const hourlyItems = day.querySelectorAll('.ts-hourly-item');
+        const hourlyData = [];
+
+        hourlyItems.forEach(hour => {
+            const lis = hour.querySelectorAll('li');
+            if (lis.length < 8) return;
+
+            hourlyData.push({
+                time: lis[1].innerText.trim(),
+                condition: lis[2].querySelector('.ts-wicon')?.innerText.trim()
+                    || lis[2].innerText.replace('날씨', '').trim(),
+                temp: lis[3].innerText.trim(),
+                wind_dir: lis[4].innerText.trim(),
+                wind_speed: lis[5].innerText.trim(),
+                cloud: lis[6].innerText.trim(),
+                visibility: lis[7].innerText.trim()
+            });
+        });
+
+        results.push({
+            date: dateText,
+            forecasts: hourlyData
+        });
+    });
+
+    return results;
+}'''
+
+async def _fetch_forecast_playwright(ctx, icao):
+    """예외는 그대로 올려 보냅니다(재시도 여부는 fetch_scheduler가 판단)"""
+    p = await ctx.new_page()
+    try:
+        await apply_resource_filter(p, "amo_forecast")
+        f_url = http_scraper.AMO_FORECAST_URL.format(icao=icao)
+        with metrics.span("navigate", page="amo_forecast", airport=icao):
+            await p.goto(f_url, timeout=30000)
+            await p.wait_for_selector(".ts-wrap", timeout=5000)
+        with metrics.span("evaluate", page="amo_forecast", airport=icao):
+            return await p.evaluate(FORECAST_3DAY_JS)
+    finally: await p.close()
+
+def summarize_forecast_12h(forecast_data) -> str:
+    """3일 예보에서 4/8/12시간 뒤 날씨를 "A > B > C" 형식으로 요약"""
+    if not forecast_data: return " - "
+    all_hours = []
+    for day in forecast_data:
+        all_hours.extend(day.get('forecasts', []))
+    if len(all_hours) >= 12:
+        h4 = all_hours[3].get('condition', '-')
+        h8 = all_hours[7].get('condition', '-')
+        h12 = all_hours[11].get('condition', '-')
+        return f"{h4} > {h8} > {h12}"
+    return " - "
+
+def _attach_forecasts(airport_data, forecast_results) -> dict:
+    """예보를 새로 수집한 공항에 forecast_12h를 채우고, {ICAO: 3일 예보} 맵을 돌려줍니다."""
+    forecast_map = {}
+    for airport in airport_data:
+        if airport['code'] not in forecast_results:
+            continue
+        days = forecast_results[airport['code']]['data'] or []
+        airport['forecast_12h'] = summarize_forecast_12h(days)
+        forecast_map[airport['code']] = days
+    return forecast_map
+
+# --- 변경 감지 (ICAO, 관측 시각, 내용 해시) ---
+OBSERVATION_FIELDS = ("name", "condition", "iconClass", "temp", "wind_dir", "wind_speed", "visibility", "cloud", "rain", "time")
+
+def observation_fingerprint(item: dict) -> tuple:
+    payload = json.dumps([item.get(k, "") for k in OBSERVATION_FIELDS], ensure_ascii=False)
+    return (item.get('code', ""), item.get('time', ""), hashlib.sha1(payload.encode("utf-8")).hexdigest())
+
+def _plan_forecasts(airport_data, previous) -> list:
+    """
+    previous({ICAO: 이전 항목})와 관측이 같은 공항은 이전 forecast_12h를 그대로 쓰고,
+    예보를 새로 수집해야 하는 ICAO 목록만 돌려줍니다.
+    """
+    to_fetch = []
+    for airport in airport_data:
+        prev = (previous or {}).get(airport['code'])
+        if prev and prev.get('forecast_12h', " - ") != " - " and observation_fingerprint(prev) == observation_fingerprint(airport):
+            airport['forecast_12h'] = prev['forecast_12h']
+        else:
+            to_fetch.append(airport['code'])
+    skipped = len(airport_data) - len(to_fetch)
+    if skipped:
+        print(f"관측 변화 없음 {skipped}개 공항: 예보 재수집 생략")
+    return to_fetch
+
+async def scrape_airport_forecast(icao_code: str, engine: str = None):
+    """
+    특정 ICAO 코드(예: RKSI)에 대한 3일 예보를 수집합니다.
+    반환 형식: [{ "date": "2026.02.05 (목)", "forecasts": [{ "time", "condition", "temp", ... }] }, ...]
+    """
+    if (engine or SCRAPER_ENGINE) == "http":
+        data = await http_scraper.fetch_forecast(icao_code)
+        if data is not None:
+            return data
+        print(f"{icao_code} HTTP 예보 검증 실패 → Playwright로 재시도")
+
+    async with get_browser_pool().context() as context:
+        try:
+            return await _fetch_forecast_playwright(context, icao_code)
+        except Exception as e:
+            print(f"{icao_code} 예보 수집 중 오류: {e}")
+            return []
 
 # --- 1. 공항별 실시간 기상 수집 (기존 로직) ---
-async def scrape_airport_weather():
-    async with async_playwright() as p:
+AIRPORT_LIST_JS = '''() => {
+    const results = [];
+    const seenIcao = new Set();
+    const items = document.querySelectorAll('li.ca-item');
+    
+    const ICON_MAP = {
+        "mtph1": "맑음", "mtph01": "맑음", "mtph21": "맑음",
+        "mtph2": "구름조금", "mtph02": "구름조금", "mtph22": "구름조금",
+        "mtph3": "구름많음", "mtph03": "구름많음", "mtph23": "구름많음",
+        "mtph4": "흐림", "mtph04": "흐림", "mtph24": "흐림",
+        "mtph15": "맑음", "wi1": "맑음", "wi01": "맑음", "wi21": "맑음",
+        "wi2": "구름조금", "wi02": "구름조금", "wi22": "구름조금",
+        "wi3": "구름많음", "wi03": "구름많음", "wi23": "구름많음",
+        "wi4": "흐림", "wi04": "흐림", "wi24": "흐림",
+    };
+
+    items.forEach(item => {
+        const nameElement = item.querySelector('.main_air_name');
+        if (!nameElement) return;
+        
+        const code = item.querySelector('.main_air_name span')?.textContent.trim() || "";
+        if (!code || seenIcao.has(code)) return;
+        
+        const name = nameElement.childNodes[0].textContent.trim();
+        seenIcao.add(code);
+        
+        const weatherElem = item.querySelector('.main_air_wthr');
+        const iconClass = weatherElem?.querySelector('span')?.className || "";
+        let condition = "";
+        
+        const blindText = weatherElem?.querySelector('.blind, .sr-only')?.textContent.trim();
+        if (blindText) {
+            condition = blindText;
+        } else {
+            let rawText = weatherElem?.textContent.trim() || "";
+            if (rawText.includes("체감") || !rawText) {
+                const classes = iconClass.split(" ");
+                let found = false;
+                for (let c of classes) {
+                    if (ICON_MAP[c]) {
+                        condition = ICON_MAP[c];
+                        found = true;
+                        break;
+                    }
+                }
+                if (!found) {
+                    condition = rawText.replace(/체감.*/g, "").trim();
+                    if (!condition) condition = "맑음";
+                }
+            } else {
+                condition = rawText;
+            }
+        }
+
+        if (condition === "자동관측" || condition === "-") {
+            const airTextElem = item.querySelector('.main_air_text');
+            if (airTextElem) {
+                 const childNodes = airTextElem.childNodes;
+                 for (let i = 0; i < childNodes.length; i++) {
+                     if (childNodes[i].nodeName === 'BR' && childNodes[i+1]) {
+                         const nextText = childNodes[i+1].textContent.trim();
+                         if (nextText && nextText !== "자동관측") {
+                             condition = nextText;
+                             break;
+                         }
+                     }
+                 }
+            }
+        }
+        
+        if (condition === "자동관측" || !condition) condition = "-";
+        
+        const temp = item.querySelector('.main_air_text b')?.textContent.trim() || "";
+        const infoList = item.querySelectorAll('.main_air_info ul li');
+        const info = {};
+        infoList.forEach(li => {
+            const text = li.textContent.trim();
+            if (text.includes('풍향')) info.wind_dir = text.replace('풍향', '').trim();
+            if (text.includes('풍속')) info.wind_speed = text.replace('풍속', '').trim();
+            if (text.includes('시정')) info.visibility = text.replace('시정', '').trim();
+            if (text.includes('운고')) info.cloud = text.replace('운고', '').trim();
+            if (text.includes('일강수')) info.rain = text.replace('일강수', '').trim();
+        });
+        
+        const time = item.querySelector('.info_time')?.textContent.trim() || "";
+        
+        results.push({
+            name, code, condition, iconClass, temp,
+            wind_dir: info.wind_dir || "",
+            wind_speed: info.wind_speed || "",
+            visibility: info.visibility || "",
+            cloud: info.cloud || "",
+            rain: info.rain || "",
+            time
+        });
+    });
+    return results;
+}'''
+
+async def _scrape_airport_weather_playwright(previous=None):
+    async with get_browser_pool().context() as context:
         try:
-            browser = await p.chromium.launch(headless=True)
-            context = await browser.new_context()
             page = await context.new_page()
+            await apply_resource_filter(page, "amo_main")
             
-            url = "https://amo.kma.go.kr/"
+            url = http_scraper.AMO_MAIN_URL
             print(f"URL 접속 중: {url}")
-            await page.goto(url, timeout=60000)
-            await page.wait_for_selector("li.ca-item", timeout=30000)
+            with metrics.span("navigate", page="amo_main"):
+                await page.goto(url, timeout=60000)
+                await page.wait_for_selector("li.ca-item", timeout=30000)
             
-            airport_data = await page.evaluate('''() => {
-                const results = [];
-                const seenIcao = new Set();
-                const items = document.querySelectorAll('li.ca-item');
-                
-                const ICON_MAP = {
-                    "mtph1": "맑음", "mtph01": "맑음", "mtph21": "맑음",
-                    "mtph2": "구름조금", "mtph02": "구름조금", "mtph22": "구름조금",
-                    "mtph3": "구름많음", "mtph03": "구름많음", "mtph23": "구름많음",
-                    "mtph4": "흐림", "mtph04": "흐림", "mtph24": "흐림",
-                    "mtph15": "맑음", "wi1": "맑음", "wi01": "맑음", "wi21": "맑음",
-                    "wi2": "구름조금", "wi02": "구름조금", "wi22": "구름조금",
-                    "wi3": "구름많음", "wi03": "구름많음", "wi23": "구름많음",
-                    "wi4": "흐림", "wi04": "흐림", "wi24": "흐림",
-                };
-
-                items.forEach(item => {
-                    const nameElement = item.querySelector('.main_air_name');
-                    if (!nameElement) return;
-                    
-                    const code = item.querySelector('.main_air_name span')?.textContent.trim() || "";
-                    if (!code || seenIcao.has(code)) return;
-                    
-                    const name = nameElement.childNodes[0].textContent.trim();
-                    seenIcao.add(code);
-                    
-                    const weatherElem = item.querySelector('.main_air_wthr');
-                    const iconClass = weatherElem?.querySelector('span')?.className || "";
-                    let condition = "";
-                    
-                    const blindText = weatherElem?.querySelector('.blind, .sr-only')?.textContent.trim();
-                    if (blindText) {
-                        condition = blindText;
-                    } else {
-                        let rawText = weatherElem?.textContent.trim() || "";
-                        if (rawText.includes("체감") || !rawText) {
-                            const classes = iconClass.split(" ");
-                            let found = false;
-                            for (let c of classes) {
-                                if (ICON_MAP[c]) {
-                                    condition = ICON_MAP[c];
-                                    found = true;
-                                    break;
-                                }
-                            }
-                            if (!found) {
-                                condition = rawText.replace(/체감.*/g, "").trim();
-                                if (!condition) condition = "맑음";
-                            }
-                        } else {
-                            condition = rawText;
-                        }
-                    }
-
-                    if (condition === "자동관측" || condition === "-") {
-                        const airTextElem = item.querySelector('.main_air_text');
-                        if (airTextElem) {
-                             const childNodes = airTextElem.childNodes;
-                             for (let i = 0; i < childNodes.length; i++) {
-                                 if (childNodes[i].nodeName === 'BR' && childNodes[i+1]) {
-                                     const nextText = childNodes[i+1].textContent.trim();
-                                     if (nextText && nextText !== "자동관측") {
-                                         condition = nextText;
-                                         break;
-                                     }
-                                 }
-                             }
-                        }
-                    }
-                    
-                    if (condition === "자동관측" || !condition) condition = "-";
-                    
-                    const temp = item.querySelector('.main_air_text b')?.textContent.trim() || "";
-                    const infoList = item.querySelectorAll('.main_air_info ul li');
-                    const info = {};
-                    infoList.forEach(li => {
-                        const text = li.textContent.trim();
-                        if (text.includes('풍향')) info.wind_dir = text.replace('풍향', '').trim();
-                        if (text.includes('풍속')) info.wind_speed = text.replace('풍속', '').trim();
-                        if (text.includes('시정')) info.visibility = text.replace('시정', '').trim();
-                        if (text.includes('운고')) info.cloud = text.replace('운고', '').trim();
-                        if (text.includes('일강수')) info.rain = text.replace('일강수', '').trim();
-                    });
-                    
-                    const time = item.querySelector('.info_time')?.textContent.trim() || "";
-                    
-                    results.push({
-                        name, code, condition, iconClass, temp,
-                        wind_dir: info.wind_dir || "",
-                        wind_speed: info.wind_speed || "",
-                        visibility: info.visibility || "",
-                        cloud: info.cloud || "",
-                        rain: info.rain || "",
-                        time
-                    });
-                });
-                return results;
-            }''')
+            with metrics.span("evaluate", page="amo_main"):
+                airport_data = await page.evaluate(AIRPORT_LIST_JS)
             
-            # --- 상세 예보 병렬 수집 ---
-            async def fetch_forecast(ctx, icao):
-                p = await ctx.new_page()
-                try:
-                    f_url = f"https://amo.kma.go.kr/weather/airport.do?icaoCode={icao}"
-                    await p.goto(f_url, timeout=30000)
-                    await p.wait_for_selector(".ts-wrap", timeout=5000)
-                    forecast_data = await p.evaluate('''() => {
-                        const dailyItems = document.querySelectorAll('.ts-daily-item');
-                        const results = [];
-                        const targetDays = Array.from(dailyItems).slice(0, 3);
-                        targetDays.forEach(day => {
-                            const hourlyItems = day.querySelectorAll('.ts-hourly-item');
-                            const hourlyData = [];
-                            hourlyItems.forEach(hour => {
-                                const lis = hour.querySelectorAll('li');
-                                if (lis.length < 8) return;
-                                hourlyData.push({
-                                    condition: lis[2].querySelector('.ts-wicon')?.innerText.trim() || lis[2].innerText.replace('날씨', '').trim()
-                                });
-                            });
-                            results.push({ forecasts: hourlyData });
-                        });
-                        return results;
-                    }''')
-                    if not forecast_data: return " - "
-                    all_hours = []
-                    for day in forecast_data:
-                        all_hours.extend(day.get('forecasts', []))
-                    if len(all_hours) >= 12:
-                        h4 = all_hours[3].get('condition', '-')
-                        h8 = all_hours[7].get('condition', '-')
-                        h12 = all_hours[11].get('condition', '-')
-                        return f"{h4} > {h8} > {h12}"
-                    return " - "
-                except: return " - "
-                finally: await p.close()
-
-            icao_codes = [airport['code'] for airport in airport_data]
-            forecast_results = await asyncio.gather(*(fetch_forecast(context, code) for code in icao_codes))
-            for i in range(len(airport_data)):
-                airport_data[i]['forecast_12h'] = forecast_results[i]
+            # --- 상세 예보 병렬 수집 (동시 실행 수 제한) ---
+            icao_codes = _plan_forecasts(airport_data, previous)
+            forecast_results = await run_bounded(icao_codes, lambda code: _fetch_forecast_playwright(context, code))
+            print(f"상세 예보 수집: {summarize_status(forecast_results)}")
+            forecast_map = _attach_forecasts(airport_data, forecast_results)
             
-            return airport_data
+            return airport_data, forecast_map
         except Exception as e:
             print(f"오류 발생: {e}")
-            return []
-        finally:
-            if 'browser' in locals(): await browser.close()
+            return [], {}
+
+async def _scrape_airport_weather_http(previous=None):
+    """브라우저 없이 수집. 공항 목록 검증 실패 시 None (→ Playwright 폴백)"""
+    airport_data = await http_scraper.fetch_airport_list()
+    if airport_data is None:
+        return None
+
+    icao_codes = _plan_forecasts(airport_data, previous)
+    started = time.monotonic()
+    # HTTP 검증 실패는 재시도해도 같으므로 바로 Playwright 폴백으로 넘깁니다
+    forecast_results = await run_bounded(icao_codes, http_scraper.fetch_forecast, retries=0)
+
+    # 예보 페이지 검증 실패한 공항만 Playwright로 재시도
+    missing = [code for code, r in forecast_results.items() if r['status'] != STATUS_OK]
+    if missing:
+        print(f"HTTP 예보 검증 실패 {len(missing)}건 → Playwright로 재시도")
+        async with get_browser_pool().context() as context:
+            fallback = await run_bounded(
+                missing, lambda code: _fetch_forecast_playwright(context, code),
+                deadline=FORECAST_DEADLINE_SECONDS - (time.monotonic() - started),
+            )
+        forecast_results.update(fallback)
+    print(f"상세 예보 수집: {summarize_status(forecast_results)}")
+
+    return airport_data, _attach_forecasts(airport_data, forecast_results)
+
+async def scrape_weather_and_forecasts(engine: str = None, previous: dict = None):
+    """
+    공항별 실시간 기상과 3일 예보를 한 번에 수집합니다(예보 페이지는 공항당 1회만 방문).
+    반환: (airport_data, {ICAO: 3일 예보}) — airport_data의 forecast_12h는 3일 예보에서 계산
+    previous({ICAO: 이전 항목})를 주면 관측이 바뀌지 않은 공항은 예보를 다시 수집하지 않고
+    이전 forecast_12h를 재사용합니다. 이 공항들은 예보 맵에 포함되지 않습니다.
+    engine="http" (또는 SCRAPER_ENGINE=http) 이면 브라우저 없이 먼저 시도하고,
+    검증에 실패하면 Playwright로 다시 수집합니다.
+    """
+    engine = engine or SCRAPER_ENGINE
+    if engine == "http":
+        result = await _scrape_airport_weather_http(previous)
+        if result:
+            return result
+        print("HTTP 엔진 검증 실패 → Playwright로 재시도")
+    return await _scrape_airport_weather_playwright(previous)
+
+async def scrape_airport_weather(engine: str = None):
+    """공항별 실시간 기상 + 12시간 예보 요약을 수집합니다."""
+    airport_data, _ = await scrape_weather_and_forecasts(engine)
+    return airport_data
 
 # --- 2. 기상청 특보 수집 (수정 및 로깅 강화) ---
+SPECIAL_REPORT_LINES_JS = '''() => {
+    const results = [];
+    const paragraphs = document.querySelectorAll('.cmp-weather-cmt-txt-box .paragraph');
+    paragraphs.forEach(el => {
+        const html = el.innerHTML.replace(/<br\s*\/?>/gi, '\\n');
+        const temp = document.createElement('div');
+        temp.innerHTML = html;
+        const text = temp.innerText;
+        text.split('\\n').forEach(line => {
+            const trimmed = line.trim();
+            if (trimmed.startsWith('o')) results.push(trimmed);
+        });
+    });
+    return results;
+}'''
+
 async def scrape_special_reports():
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=True)
-        page = await browser.new_page()
-        url = "https://www.weather.go.kr/w/special-report/overall.do"
+    async with get_browser_pool().page() as page:
+        url = SPECIAL_REPORT_URL
         print(f"특보 정보 접속 중: {url}")
         
         try:
-            await page.goto(url, timeout=60000)
-            # [수정] 자바스크립트 로딩 완료 및 셀렉터 대기
-            await page.wait_for_load_state("networkidle", timeout=10000)
-            await page.wait_for_selector(".cmp-weather-cmt-txt-box", timeout=30000)
+            await apply_resource_filter(page, "special_report")
+            with metrics.span("navigate", page="special_report"):
+                await page.goto(url, timeout=60000)
+                # [수정] 자바스크립트 로딩 완료 및 셀렉터 대기
+                await page.wait_for_load_state("networkidle", timeout=10000)
+                await page.wait_for_selector(".cmp-weather-cmt-txt-box", timeout=30000)
             print("특보 페이지 로드 완료, 데이터 추출 중...")
             
-            raw_lines = await page.evaluate('''() => {
-                const results = [];
-                const paragraphs = document.querySelectorAll('.cmp-weather-cmt-txt-box .paragraph');
-                paragraphs.forEach(el => {
-                    const html = el.innerHTML.replace(/<br\s*\/?>/gi, '\\n');
-                    const temp = document.createElement('div');
-                    temp.innerHTML = html;
-                    const text = temp.innerText;
-                    text.split('\\n').forEach(line => {
-                        const trimmed = line.trim();
-                        if (trimmed.startsWith('o')) results.push(trimmed);
-                    });
-                });
-                return results;
-            }''')
+            with metrics.span("evaluate", page="special_report"):
+                raw_lines = await page.evaluate(SPECIAL_REPORT_LINES_JS)
             
-            mapping_aliases = {
-                "인천": (["인천"], "인천"), "김포": (["서울", "서울특별시"], "서울서남권"),
-                "청주": (["충청북도", "충북"], "청주"), "대구": (["대구", "대구광역시"], "대구"),
-                "광주": (["광주", "광주광역시"], "광주"), "무안": (["전라남도", "전남"], "무안"),
-                "김해": (["부산", "부산광역시"], "부산 서부"), "제주": (["제주", "제주도"], "제주도북부"),
-                "원주": (["강원도", "강원"], "횡성"), "군산": (["전라북도", "전북"], "군산"),
-                "울산": (["울산", "울산광역시"], "울산동부"), "포항": (["경상북도", "경북"], "포항"),
-                "여수": (["전라남도", "전남"], "여수"), "사천": (["경상남도", "경남"], "사천"),
-                "양양": (["강원도", "강원"], "양양평지")
-            }
-
-            results = {k: [] for k in mapping_aliases.keys()}
-            import re
-            for line in raw_lines:
-                if ":" not in line: continue
-                parts = line.split(":", 1)
-                raw_type = parts[0].replace("o", "").strip()
-                if not raw_type or raw_type[0].isdigit() or "발표" in raw_type: continue
-                content = parts[1].strip()
-
-                # 특보 명칭 포맷팅
-                if "대설" in raw_type:
-                    formatted_type = "대설예" if any(x in raw_type for x in ["예보", "예비"]) else "대설주" if "주의보" in raw_type else "대설경" if "경보" in raw_type else raw_type[:3]
-                else: formatted_type = raw_type[:2]
-                
-                for airport, (uppers, lower) in mapping_aliases.items():
-                    matched = False
-                    for upper in uppers:
-                        if upper in content:
-                            pattern = re.escape(upper) + r"(?:\(([^)]+)\))?"
-                            matches = re.finditer(pattern, content)
-                            for m in matches:
-                                sub_content = m.group(1)
-                                if sub_content is None: matched = True; break
-                                else:
-                                    norm_sub, norm_lower = sub_content.replace(" ", ""), lower.replace(" ", "")
-                                    if "제외" in norm_sub:
-                                        if norm_lower not in norm_sub: matched = True; break
-                                    else:
-                                        if norm_lower in norm_sub: matched = True; break
-                    if matched and formatted_type not in results[airport]:
-                        results[airport].append(formatted_type)
-
-            final_data = [{"airport": ap, "special_report": ", ".join(reps) if reps else "-"} for ap, reps in results.items()]
+            with metrics.span("special_report_parse"):
+                final_data = match_special_reports(raw_lines)
             print(f"특보 수집 완료: {len([f for f in final_data if f['special_report'] != '-'])}건 매칭됨")
             return final_data
         except Exception as e:
             print(f"특보 스크래핑 오류: {e}")
             return []
-        finally: await browser.close()
 
 # --- 3. 실행 및 DB 저장 ---
 async def run():
@@ -259,7 +359,14 @@ async def run():
     weather_task = scrape_airport_weather()
     report_task = scrape_special_reports()
     
-    airport_weather, special_reports = await asyncio.gather(weather_task, report_task)
+    with metrics.cycle("scrape_cycle"):
+        try:
+            airport_weather, special_reports = await asyncio.gather(weather_task, report_task)
+        finally:
+            await close_browser_pool()
+            await http_scraper.close_http_client()
+    print(f"리소스 필터: {resource_filter_stats.format_report()}")
+    print(f"구간별 소요: {metrics.summary()}")
     
     if not airport_weather:
         print("❌ 수집된 날씨 데이터가 없습니다. 중단합니다.")
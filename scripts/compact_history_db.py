@@ -0,0 +1,77 @@
+"""
+weather_history.db 1회성 변환: JSON 텍스트로 저장된 weather_data.data_json 을
+압축 BLOB(snapshot_codec.py)으로 바꾸고 VACUUM 으로 파일 크기를 회수합니다.
+이미 변환된 행은 건너뛰므로 여러 번 실행해도 됩니다.
+
+사용법:
+  python scripts/compact_history_db.py              # 변환 + VACUUM
+  python scripts/compact_history_db.py --dry-run    # 예상 크기만 출력
+  python scripts/compact_history_db.py --revert     # 다시 JSON 텍스트로 (롤백용)
+서버(app.py)를 멈춘 상태에서 실행하세요 (VACUUM은 DB 전체를 다시 씁니다).
+"""
+import os
+import sys
+import json
+import sqlite3
+import argparse
+
+# 상위 폴더의 모듈을 인식하기 위한 경로 설정
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from snapshot_codec import encode_item, decode_item
+
+
+def _convert(conn: sqlite3.Connection, revert: bool, dry_run: bool, batch_size: int):
+    """변환 대상 행을 id 순으로 batch_size 개씩 바꿉니다. (행 수, 변환 전 바이트, 변환 후 바이트)"""
+    source_type = "blob" if revert else "text"
+    last_id, rows_done, before, after = 0, 0, 0, 0
+    while True:
+        rows = conn.execute('''
+            SELECT id, data_json FROM weather_data
+            WHERE id > ? AND typeof(data_json) = ?
+            ORDER BY id LIMIT ?
+        ''', (last_id, source_type, batch_size)).fetchall()
+        if not rows:
+            return rows_done, before, after
+        updates = []
+        for row_id, value in rows:
+            item = decode_item(value)
+            new_value = json.dumps(item, ensure_ascii=False) if revert else encode_item(item)
+            before += len(value.encode("utf-8") if isinstance(value, str) else value)
+            after += len(new_value.encode("utf-8") if isinstance(new_value, str) else new_value)
+            updates.append((new_value, row_id))
+        if not dry_run:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.executemany("UPDATE weather_data SET data_json = ? WHERE id = ?", updates)
+            conn.execute("COMMIT")
+        last_id, rows_done = rows[-1][0], rows_done + len(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--db", default=None, help="DB 경로 (기본: database.DATABASE_PATH)")
+    parser.add_argument("--dry-run", action="store_true", help="변환하지 않고 예상 크기만 출력")
+    parser.add_argument("--revert", action="store_true", help="압축 BLOB → JSON 텍스트")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    if args.db is None:
+        import database  # 스키마/마이그레이션 보장
+        args.db = database.DATABASE_PATH
+
+    file_before = os.path.getsize(args.db)
+    conn = sqlite3.connect(args.db, timeout=30, isolation_level=None)
+    try:
+        rows, before, after = _convert(conn, args.revert, args.dry_run, max(1, args.batch_size))
+        print(f"📦 data_json {'(dry run) ' if args.dry_run else ''}{rows}행 변환: "
+              f"{before:,} → {after:,} bytes")
+        if rows and not args.dry_run:
+            conn.execute("VACUUM")
+            # WAL 모드에서는 체크포인트 후에야 본 파일이 줄어듦
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            print(f"🧹 VACUUM 완료: 파일 {file_before:,} → {os.path.getsize(args.db):,} bytes")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
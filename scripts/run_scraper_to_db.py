@@ -5,151 +5,127 @@ import psycopg2
 import sys
 from urllib.parse import urlparse
 from datetime import datetime
-from playwright.async_api import async_playwright  # ★ 추가
 
 # 상위 폴더의 scraper.py를 인식하기 위한 경로 설정
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from scraper import (
-    scrape_airport_weather,
+    scrape_weather_and_forecasts,
     scrape_special_reports,
-    # scrape_airport_forecast 를 더 이상 scraper에서 가져오지 않습니다.
+    observation_fingerprint,
 )
-
-# --- 이 파일 안에 3일 예보 수집 함수 직접 구현 ---
-async def scrape_airport_forecast(icao_code: str):
+from browser_pool import close_browser_pool
+import http_scraper
+from resource_filter import stats as resource_filter_stats
+from metrics import metrics
+from latest_db import open_latest_db
+
+# 관측(time/값)이 바뀌지 않은 공항은 예보 재수집과 DB 쓰기를 생략
+INCREMENTAL_ENABLED = os.getenv("INCREMENTAL_ENABLED", "1") not in ("0", "false", "False")
+# 관측이 그대로여도 예보가 이 시간보다 오래되면 다시 수집 (예보는 관측과 별개로 갱신됨)
+FORECAST_MAX_AGE_MINUTES = int(os.getenv("FORECAST_MAX_AGE_MINUTES", "60"))
+
+
+def _connect(db_url: str):
+    result = urlparse(db_url)
+    return psycopg2.connect(
+        database=result.path[1:],
+        user=result.username,
+        password=result.password,
+        host=result.hostname,
+        port=result.port,
+    )
+
+
+def load_previous_state(db_url: str):
     """
-    특정 ICAO 코드(예: RKSI)에 대한 3일 예보를 기상청 사이트에서 수집합니다.
-    반환 형식 예:
-    [
-      {
-        "date": "2026.02.05 (목)",
-        "forecasts": [
-          { "time": "00시", "condition": "...", "temp": "...", ... },
-          ...
-        ]
-      },
-      ...
-    ]
+    직전 사이클의 weather_latest 와, 예보가 충분히 최신인 공항 목록을 읽어
+    ({ICAO: 이전 항목}, 이전 특보 목록)을 반환합니다. 실패하면 ({}, None).
     """
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=True)
-        page = await browser.new_page()
-
-        url = f"https://amo.kma.go.kr/weather/airport.do?icaoCode={icao_code}"
-        print(f"상세 예보 접속 중: {url}")
-
+    try:
+        conn = _connect(db_url)
         try:
-            await page.goto(url, timeout=60000)
-            # 타임 슬라이더 영역 대기
-            await page.wait_for_selector(".ts-wrap", timeout=30000)
-
-            forecast_data = await page.evaluate(
-                """() => {
-                    const dailyItems = document.querySelectorAll('.ts-daily-item');
-                    const results = [];
-
-                    // 조회일 포함 상위 3일만 처리
-                    const targetDays = Array.from(dailyItems).slice(0, 3);
-
-                    targetDays.forEach(day => {
-                        const dateText = day.querySelector('.ts-daily-head h3')?.innerText.trim() || "";
-                        const hourlyItems = day.querySelectorAll('.ts-hourly-item');
-                        const hourlyData = [];
-
-                        hourlyItems.forEach(hour => {
-                            const lis = hour.querySelectorAll('li');
-                            if (lis.length < 8) return;
-
-                            hourlyData.push({
-                                time: lis[1].innerText.trim(),
-                                condition: lis[2].querySelector('.ts-wicon')?.innerText.trim()
-                                    || lis[2].innerText.replace('날씨', '').trim(),
-                                temp: lis[3].innerText.trim(),
-                                wind_dir: lis[4].innerText.trim(),
-                                wind_speed: lis[5].innerText.trim(),
-                                cloud: lis[6].innerText.trim(),
-                                visibility: lis[7].innerText.trim()
-                            });
-                        });
-
-                        results.push({
-                            date: dateText,
-                            forecasts: hourlyData
-                        });
-                    });
-
-                    return results;
-                }"""
-            )
+            cur = conn.cursor()
+            cur.execute("SELECT data, special_reports FROM weather_latest WHERE id = 1")
+            row = cur.fetchone()
+            if not row:
+                return {}, None
+            prev_items, prev_reports = row[0] or [], row[1]
 
-            return forecast_data
-        except Exception as e:
-            print(f"{icao_code} 예보 수집 중 오류: {e}")
-            return []
+            cur.execute(
+                "SELECT airport_code FROM airport_forecast_3day "
+                "WHERE updated_at > CURRENT_TIMESTAMP - (%s * INTERVAL '1 minute')",
+                (FORECAST_MAX_AGE_MINUTES,),
+            )
+            fresh_codes = {r[0] for r in cur.fetchall()}
         finally:
-            await browser.close()
-
-
-async def collect_forecasts(airport_weather: list) -> dict:
-    """
-    위에서 정의한 scrape_airport_forecast 를 이용해서
-    각 공항 코드(ICAO)에 대한 3일 예보를 수집합니다.
-    """
-    # airport_weather 안에 들어있는 code 값들만 사용
-    codes = sorted({item.get("code") for item in airport_weather if item.get("code")})
-    forecasts: dict[str, list] = {}
+            conn.close()
+    except Exception as e:
+        print(f"⚠️ 이전 상태 조회 실패 (전체 수집으로 진행): {e}")
+        return {}, None
 
-    print(f"🌤 3일 예보 수집 대상 공항 수: {len(codes)}")
+    items = {item.get("code"): item for item in prev_items if isinstance(item, dict)}
+    previous = {code: item for code, item in items.items() if code in fresh_codes}
+    return previous, prev_reports
 
-    for code in codes:
-        try:
-            print(f"📡 {code} 3일 예보 수집 중...")
-            data = await scrape_airport_forecast(code)
-            # data 형식: [{ date, forecasts: [...] }, ...]
-            forecasts[code] = data or []
-            print(f"  → {code}: {len(forecasts[code])}일 분 데이터")
-        except Exception as e:
-            print(f"  ❌ {code} 예보 수집 실패: {e}")
-            forecasts[code] = []
 
-    return forecasts
+def _weather_unchanged(airport_weather, special_reports, previous_items, prev_reports) -> bool:
+    if prev_reports is None or special_reports != prev_reports:
+        return False
+    if {a.get("code") for a in airport_weather} != set(previous_items):
+        return False
+    return all(
+        observation_fingerprint(a) == observation_fingerprint(previous_items[a["code"]])
+        and a.get("forecast_12h") == previous_items[a["code"]].get("forecast_12h")
+        for a in airport_weather
+    )
 
 
 async def main():
     print(f"🚀 데이터 수집 프로세스 시작: {datetime.now()}")
 
-    # 1. 현재 날씨 + 특보 수집
+    db_url = os.environ.get("DATABASE_URL")
+    # 로컬 개발용: DATABASE_URL=sqlite:///weather_latest.db 이면 같은 테이블을 SQLite에 저장 (app.py WEATHER_SOURCE=db 용)
+    is_sqlite = bool(db_url) and db_url.startswith("sqlite:///")
+
+    # 0. 변경 감지를 위한 직전 상태
+    previous, prev_reports = {}, None
+    if INCREMENTAL_ENABLED and db_url and not is_sqlite:
+        with metrics.span("load_previous"):
+            previous, prev_reports = load_previous_state(db_url)
+        print(f"🔎 예보 재사용 후보: {len(previous)}개 공항")
+
+    # 1~2. 현재 날씨 + 3일 예보(공항별 예보 페이지 1회 방문) + 특보 수집
     try:
-        weather_task = scrape_airport_weather()
+        weather_task = scrape_weather_and_forecasts(previous=previous)
         report_task = scrape_special_reports()
-        airport_weather, special_reports = await asyncio.gather(weather_task, report_task)
+        with metrics.span("scrape"):
+            (airport_weather, forecast_map), special_reports = await asyncio.gather(weather_task, report_task)
         print(f"✅ 수집 완료: 날씨 {len(airport_weather)}건, 특보 {len(special_reports)}건")
+        print(f"🌤 3일 예보 수집 완료: {sum(1 for days in forecast_map.values() if days)}/{len(forecast_map)}개 공항 "
+              f"(변경 없음 {len(airport_weather) - len(forecast_map)}개 생략)")
+        print(f"🧹 리소스 필터: {resource_filter_stats.format_report()}")
     except Exception as e:
         print(f"❌ 수집 단계 오류: {e}")
         return
 
-    # 2. 3일 예보 수집
-    try:
-        forecast_map = await collect_forecasts(airport_weather)
-    except Exception as e:
-        print(f"⚠️ 3일 예보 수집 전체 실패 (무시하고 진행): {e}")
-        forecast_map = {}
-
     # 3. DB 연결
-    db_url = os.environ.get("DATABASE_URL")
     if not db_url:
         print("❌ DATABASE_URL 없음 (GitHub Secrets에 설정 필요)")
         return
 
+    if is_sqlite:
+        latest_db = open_latest_db(db_url)
+        try:
+            with metrics.span("db_upsert", table="weather_latest"):
+                latest_db.save_latest(airport_weather, special_reports, forecast_map)
+            print(f"✨ SQLite 저장 완료: {db_url}")
+        finally:
+            latest_db.close()
+        return
+
     try:
-        result = urlparse(db_url)
-        conn = psycopg2.connect(
-            database=result.path[1:],
-            user=result.username,
-            password=result.password,
-            host=result.hostname,
-            port=result.port,
-        )
+        with metrics.span("db_connect"):
+            conn = _connect(db_url)
         cur = conn.cursor()
 
         # 3-1. weather_latest 업데이트 (기존 로직)
@@ -161,14 +137,21 @@ async def main():
             special_reports = EXCLUDED.special_reports,
             updated_at = EXCLUDED.updated_at;
         """
-        cur.execute(
-            weather_query,
-            (
-                json.dumps(airport_weather, ensure_ascii=False),
-                json.dumps(special_reports, ensure_ascii=False),
-            ),
-        )
-        print("✨ weather_latest 갱신 완료")
+        if INCREMENTAL_ENABLED and _weather_unchanged(airport_weather, special_reports, previous, prev_reports):
+            # 본문 쓰기는 생략하되 updated_at은 갱신 (api/weather.js 의 last_updated, app.py db 모드 예보 재로딩 기준)
+            with metrics.span("db_touch", table="weather_latest"):
+                cur.execute("UPDATE weather_latest SET updated_at = CURRENT_TIMESTAMP WHERE id = 1")
+            print("⏭ weather_latest 변경 없음, 본문 쓰기 생략 (updated_at만 갱신)")
+        else:
+            with metrics.span("db_upsert", table="weather_latest"):
+                cur.execute(
+                    weather_query,
+                    (
+                        json.dumps(airport_weather, ensure_ascii=False),
+                        json.dumps(special_reports, ensure_ascii=False),
+                    ),
+                )
+            print("✨ weather_latest 갱신 완료")
 
         # 3-2. 공항별 3일 예보 저장
         forecast_query = """
@@ -181,14 +164,19 @@ async def main():
 
         saved_count = 0
         for code, data in forecast_map.items():
-            cur.execute(
-                forecast_query,
-                (code, json.dumps(data, ensure_ascii=False)),
-            )
+            if not data:
+                # 수집 실패한 공항은 기존 예보를 지우지 않도록 건너뜀
+                continue
+            with metrics.span("db_upsert", table="airport_forecast_3day", airport=code):
+                cur.execute(
+                    forecast_query,
+                    (code, json.dumps(data, ensure_ascii=False)),
+                )
             saved_count += 1
 
-        conn.commit()
-        print(f"✨ 3일 예보 저장 완료: {saved_count}개 공항")
+        with metrics.span("db_commit"):
+            conn.commit()
+        print(f"✨ 3일 예보 저장 완료: {saved_count}개 공항 (생략 {len(airport_weather) - saved_count}개)")
 
     except Exception as e:
         print(f"❌ DB 오류: {e}")
@@ -198,5 +186,16 @@ async def main():
             print("🔌 DB 연결 종료")
 
 
+async def _main_with_pool():
+    # METRICS_JSONL_PATH / METRICS_PROM_PATH 를 지정하면 사이클 종료 시 구간별 계측을 파일로 남김
+    with metrics.cycle("scrape_cycle"):
+        try:
+            await main()
+        finally:
+            await close_browser_pool()
+            await http_scraper.close_http_client()
+    print(f"⏱ 구간별 소요: {metrics.summary()}")
+
+
 if __name__ == "__main__":
-    asyncio.run(main())
+    asyncio.run(_main_with_pool())
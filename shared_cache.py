@@ -0,0 +1,186 @@
+"""
+/api/weather 캐시 저장소.
+- memory: 프로세스 내부 dict (기본, 워커 1개)
+- sqlite: 같은 호스트의 여러 워커가 하나의 SQLite 파일을 공유
+  · 모든 워커가 같은 응답 바이트(압축본/ETag 포함)와 last_updated를 읽음
+  · 갱신 임대(lease)를 잡은 워커 1개만 스크래핑, 나머지는 결과가 저장되길 기다렸다가 읽음
+  · version 컬럼으로 변경 여부를 싸게 확인
+
+저장 항목(entry): {"fetched_at", "last_updated", "data", "forecasts", "last_error", "encoded"}
+encoded = {"etag": str, "variants": {"identity"|"gzip"|"br": bytes}}
+메서드는 동기 함수입니다. shared=True 인 저장소는 run_in_executor로 호출하세요.
+"""
+import os
+import json
+import time
+import sqlite3
+import threading
+from typing import Dict, Optional
+
+WEATHER_CACHE_BACKEND = os.getenv("WEATHER_CACHE_BACKEND", "memory")
+WEATHER_CACHE_PATH = os.getenv("WEATHER_CACHE_PATH", "weather_cache.db")
+
+_VARIANT_COLUMNS = (("identity", "body"), ("gzip", "body_gzip"), ("br", "body_br"))
+
+
+class MemoryCacheStore:
+    """프로세스 내부 저장소 (기존 동작). 임대는 항상 성공합니다."""
+    shared = False
+
+    def __init__(self):
+        self._entry: Optional[Dict] = None
+        self._version = 0
+
+    def version(self) -> int:
+        return self._version
+
+    def load(self) -> Optional[Dict]:
+        return dict(self._entry) if self._entry else None
+
+    def save(self, entry: Dict) -> int:
+        self._entry = dict(entry)
+        self._version += 1
+        return self._version
+
+    def save_error(self, message: str) -> int:
+        self._entry = dict(self._entry or {}, last_error=message)
+        self._version += 1
+        return self._version
+
+    def acquire_lease(self, owner: str, ttl: float) -> bool:
+        return True
+
+    def release_lease(self, owner: str):
+        pass
+
+    def lease_expires_at(self) -> float:
+        return 0.0
+
+
+class SQLiteCacheStore:
+    """여러 워커 프로세스가 공유하는 SQLite 저장소 (WAL)."""
+    shared = True
+
+    def __init__(self, path: str = WEATHER_CACHE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=10, check_same_thread=False, isolation_level=None)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute('''
+                CREATE TABLE IF NOT EXISTS weather_cache (
+                    id INTEGER PRIMARY KEY CHECK (id = 1),
+                    version INTEGER NOT NULL,
+                    fetched_at REAL,
+                    last_updated TEXT,
+                    data TEXT,
+                    forecasts TEXT,
+                    last_error TEXT,
+                    etag TEXT,
+                    body BLOB,
+                    body_gzip BLOB,
+                    body_br BLOB
+                )
+            ''')
+            self._conn.execute('''
+                CREATE TABLE IF NOT EXISTS weather_refresh_lease (
+                    id INTEGER PRIMARY KEY CHECK (id = 1),
+                    owner TEXT NOT NULL,
+                    expires_at REAL NOT NULL
+                )
+            ''')
+
+    def version(self) -> int:
+        with self._lock:
+            row = self._conn.execute("SELECT version FROM weather_cache WHERE id = 1").fetchone()
+        return row[0] if row else 0
+
+    def load(self) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute('''
+                SELECT fetched_at, last_updated, data, forecasts, last_error, etag, body, body_gzip, body_br
+                FROM weather_cache WHERE id = 1
+            ''').fetchone()
+        if not row:
+            return None
+        fetched_at, last_updated, data, forecasts, last_error, etag = row[:6]
+        encoded = None
+        if etag and row[6] is not None:
+            variants = {name: bytes(blob) for (name, _), blob in zip(_VARIANT_COLUMNS, row[6:]) if blob is not None}
+            encoded = {"etag": etag, "variants": variants}
+        return {
+            "fetched_at": fetched_at or 0.0,
+            "last_updated": last_updated,
+            "data": json.loads(data) if data else None,
+            "forecasts": json.loads(forecasts) if forecasts else {},
+            "last_error": last_error,
+            "encoded": encoded,
+        }
+
+    def save(self, entry: Dict) -> int:
+        encoded = entry.get("encoded") or {"etag": None, "variants": {}}
+        variants = encoded["variants"]
+        with self._lock:
+            self._conn.execute('''
+                INSERT INTO weather_cache
+                    (id, version, fetched_at, last_updated, data, forecasts, last_error, etag, body, body_gzip, body_br)
+                VALUES (1, 1, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(id) DO UPDATE SET
+                    version = weather_cache.version + 1,
+                    fetched_at = excluded.fetched_at,
+                    last_updated = excluded.last_updated,
+                    data = excluded.data,
+                    forecasts = excluded.forecasts,
+                    last_error = excluded.last_error,
+                    etag = excluded.etag,
+                    body = excluded.body,
+                    body_gzip = excluded.body_gzip,
+                    body_br = excluded.body_br
+            ''', (
+                entry.get("fetched_at"),
+                entry.get("last_updated"),
+                json.dumps(entry.get("data"), ensure_ascii=False),
+                json.dumps(entry.get("forecasts") or {}, ensure_ascii=False),
+                entry.get("last_error"),
+                encoded["etag"],
+                *(variants.get(name) for name, _ in _VARIANT_COLUMNS),
+            ))
+            return self._conn.execute("SELECT version FROM weather_cache WHERE id = 1").fetchone()[0]
+
+    def save_error(self, message: str) -> int:
+        with self._lock:
+            self._conn.execute('''
+                INSERT INTO weather_cache (id, version, last_error) VALUES (1, 1, ?)
+                ON CONFLICT(id) DO UPDATE SET version = weather_cache.version + 1, last_error = excluded.last_error
+            ''', (message,))
+            return self._conn.execute("SELECT version FROM weather_cache WHERE id = 1").fetchone()[0]
+
+    def acquire_lease(self, owner: str, ttl: float) -> bool:
+        """임대가 비었거나 만료됐거나 이미 내 것이면 ttl초 동안 잡고 True."""
+        now = time.time()
+        with self._lock:
+            cur = self._conn.execute('''
+                INSERT INTO weather_refresh_lease (id, owner, expires_at) VALUES (1, ?, ?)
+                ON CONFLICT(id) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at
+                WHERE weather_refresh_lease.expires_at < ? OR weather_refresh_lease.owner = excluded.owner
+            ''', (owner, now + ttl, now))
+            return cur.rowcount == 1
+
+    def release_lease(self, owner: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM weather_refresh_lease WHERE id = 1 AND owner = ?", (owner,))
+
+    def lease_expires_at(self) -> float:
+        """현재 임대 만료 시각 (임대가 없으면 0)"""
+        with self._lock:
+            row = self._conn.execute("SELECT expires_at FROM weather_refresh_lease WHERE id = 1").fetchone()
+        return row[0] if row else 0.0
+
+
+def make_cache_store(backend: str = WEATHER_CACHE_BACKEND):
+    if backend == "sqlite":
+        return SQLiteCacheStore()
+    if backend != "memory":
+        raise ValueError(f"알 수 없는 WEATHER_CACHE_BACKEND: {backend}")
+    return MemoryCacheStore()
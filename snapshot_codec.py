@@ -0,0 +1,87 @@
+"""
+weather_history.db 의 weather_data.data_json 압축 저장 형식.
+행마다 같은 키(name, code, condition, iconClass, wind_dir ...)와 거의 같은 값이 반복되므로
+공유 사전(preset dictionary)을 쓰는 zlib(raw deflate)로 항목 1개씩 압축해 BLOB으로 저장합니다.
+  BLOB = 형식 바이트(1) + raw deflate(압축 JSON, zdict=_DICTIONARIES[형식])
+기존 TEXT 행(JSON 문자열)도 그대로 읽으므로 섞여 있어도 됩니다 (SQLite 동적 타입).
+
+사전 내용은 이미 저장된 행을 풀 때 필요하므로 절대 바꾸지 마세요.
+바꿔야 하면 새 형식 번호로 _DICTIONARIES 에 추가하고 CURRENT_FORMAT 을 올립니다.
+
+기존 DB 변환: python scripts/compact_history_db.py
+"""
+import os
+import json
+import zlib
+from typing import Dict, Union
+
+# 0이면 새 행을 예전처럼 JSON 텍스트로 저장
+HISTORY_COMPACT_STORAGE = os.getenv("HISTORY_COMPACT_STORAGE", "1") != "0"
+
+_AIRPORTS = (
+    ("RKSI", "인천"), ("RKSS", "김포"), ("RKPC", "제주"), ("RKPK", "김해"), ("RKTU", "청주"),
+    ("RKTN", "대구"), ("RKPU", "울산"), ("RKJB", "무안"), ("RKJJ", "광주"), ("RKJY", "여수"),
+    ("RKNY", "양양"), ("RKPS", "사천"), ("RKTH", "포항"), ("RKNW", "원주"), ("RKJK", "군산"),
+)
+_CONDITIONS = ("맑음", "구름조금", "구름많음", "흐림", "비", "눈", "비/눈", "소나기", "안개", "박무", "연무")
+_ICON_CODES = ("sunny", "cloudy", "rain", "snow", "mist")
+_WIND_DIRS = ("북", "북북동", "북동", "동북동", "동", "동남동", "남동", "남남동",
+              "남", "남남서", "남서", "서남서", "서", "서북서", "북서", "북북서")
+_ADVISORIES = ("없음", "건조", "한파", "풍랑", "강풍", "대설", "호우", "폭염", "한파, 건조")
+
+
+def _compact_json(item) -> bytes:
+    return json.dumps(item, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _dictionary_v1() -> bytes:
+    """형식 1 사전: 스크래퍼 원본 항목 / 프론트엔드 저장 항목 견본 + 자주 나오는 값.
+    deflate는 사전의 뒤쪽일수록 짧은 거리로 참조하므로 가장 흔한 견본을 끝에 둡니다."""
+    values = "".join(
+        [f'"{code}","{name}","{name}공항"' for code, name in _AIRPORTS]
+        + [f'"{value}"' for value in _CONDITIONS + _ICON_CODES + _WIND_DIRS + _ADVISORIES]
+        + [f'"mtph{n}"' for n in ("01", "02", "03", "04", "15", "21", "22", "23", "24")]
+    )
+    scraped = {
+        "name": "인천공항", "code": "RKSI", "condition": "구름많음", "iconClass": "mtph23", "temp": "-2.0℃",
+        "wind_dir": "북북서", "wind_speed": "13 kt", "visibility": "10 km ↑", "cloud": "25,000 ft",
+        "rain": "- mm", "time": "2026년 1월 29일(목) 22:00(KST)", "forecast_12h": "맑음 > 구름조금 > 구름많음",
+    }
+    frontend = {
+        "airportName": "인천", "icao": "RKSI",
+        "current": {"condition": "맑음", "temperature": "-6.5℃", "iconCode": "sunny"},
+        "forecast12h": [{"time": "4h", "iconCode": "sunny"}, {"time": "8h", "iconCode": "cloudy"},
+                        {"time": "12h", "iconCode": "cloudy"}],
+        "advisories": "없음", "snowfall": "-", "kmaTargetRegion": "-",
+        "matchingLogic": "데이터 수집 시각: 2026년 1월 29일(목) 22:00(KST)",
+    }
+    return values.encode("utf-8") + _compact_json(scraped) + _compact_json(frontend)
+
+
+_DICTIONARIES = {1: _dictionary_v1()}
+CURRENT_FORMAT = 1
+
+
+def encode_item(item: Dict, fmt: int = CURRENT_FORMAT) -> bytes:
+    """항목 1개 → 형식 바이트 + 압축 본문"""
+    compressor = zlib.compressobj(9, zlib.DEFLATED, -15, 9, zlib.Z_DEFAULT_STRATEGY, _DICTIONARIES[fmt])
+    return bytes([fmt]) + compressor.compress(_compact_json(item)) + compressor.flush()
+
+
+def encode_for_storage(item: Dict) -> Union[bytes, str]:
+    """data_json 컬럼에 넣을 값 (HISTORY_COMPACT_STORAGE=0 이면 기존 JSON 텍스트)"""
+    if HISTORY_COMPACT_STORAGE:
+        return encode_item(item)
+    return json.dumps(item, ensure_ascii=False)
+
+
+def decode_item(value: Union[bytes, str]) -> Dict:
+    """data_json 값(압축 BLOB 또는 JSON 텍스트) → 항목. 알 수 없는 형식이면 ValueError"""
+    if isinstance(value, str):
+        return json.loads(value)
+    value = bytes(value)
+    dictionary = _DICTIONARIES.get(value[0]) if value else None
+    if dictionary is None:
+        raise ValueError(f"unknown data_json format: {value[:1]!r}")
+    decompressor = zlib.decompressobj(-15, dictionary)
+    return json.loads(decompressor.decompress(value[1:]) + decompressor.flush())
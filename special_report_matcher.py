@@ -0,0 +1,81 @@
+"""
+기상특보 문장 → 공항별 특보 매칭.
+모든 상위 지역 별칭을 하나의 정규식(긴 별칭 우선 alternation)으로 모듈 로드 시 1회 컴파일하고,
+특보 문장 한 줄을 한 번만 훑어 매칭합니다. 브라우저 없이 저장된 텍스트로도 동작하는 순수 함수입니다.
+"""
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# 공항: ([상위 지역 별칭...], 하위 지역)
+MAPPING_ALIASES = {
+    "인천": (["인천"], "인천"), "김포": (["서울", "서울특별시"], "서울서남권"),
+    "청주": (["충청북도", "충북"], "청주"), "대구": (["대구", "대구광역시"], "대구"),
+    "광주": (["광주", "광주광역시"], "광주"), "무안": (["전라남도", "전남"], "무안"),
+    "김해": (["부산", "부산광역시"], "부산 서부"), "제주": (["제주", "제주도"], "제주도북부"),
+    "원주": (["강원도", "강원"], "횡성"), "군산": (["전라북도", "전북"], "군산"),
+    "울산": (["울산", "울산광역시"], "울산동부"), "포항": (["경상북도", "경북"], "포항"),
+    "여수": (["전라남도", "전남"], "여수"), "사천": (["경상남도", "경남"], "사천"),
+    "양양": (["강원도", "강원"], "양양평지")
+}
+
+
+def _build_index(mapping: Dict[str, Tuple[List[str], str]]):
+    """별칭 → [(공항, 공백 제거한 하위 지역)] 색인과 단일 정규식을 만듭니다."""
+    index: Dict[str, List[Tuple[str, str]]] = {}
+    for airport, (uppers, lower) in mapping.items():
+        for upper in uppers:
+            index.setdefault(upper, []).append((airport, lower.replace(" ", "")))
+    # 긴 별칭을 먼저 두어 "강원도(...)" 가 "강원" 으로 잘려 괄호 조건을 놓치지 않게 함
+    alternation = "|".join(re.escape(a) for a in sorted(index, key=len, reverse=True))
+    return index, re.compile("(" + alternation + r")(?:\(([^)]+)\))?")
+
+
+_ALIAS_INDEX, _REGION_RE = _build_index(MAPPING_ALIASES)
+
+
+def format_report_type(raw_type: str) -> str:
+    """특보 명칭 포맷팅 (예: "대설주의보" → "대설주", "강풍주의보" → "강풍")"""
+    if "대설" in raw_type:
+        if any(x in raw_type for x in ["예보", "예비"]): return "대설예"
+        if "주의보" in raw_type: return "대설주"
+        if "경보" in raw_type: return "대설경"
+        return raw_type[:3]
+    return raw_type[:2]
+
+
+def parse_report_line(line: str) -> Optional[Tuple[str, str]]:
+    """"o 강풍주의보 : 지역..." 한 줄을 (포맷된 특보명, 지역 내용)으로 분리. 대상이 아니면 None"""
+    if ":" not in line: return None
+    raw_type, content = line.split(":", 1)
+    raw_type = raw_type.replace("o", "").strip()
+    if not raw_type or raw_type[0].isdigit() or "발표" in raw_type: return None
+    return format_report_type(raw_type), content.strip()
+
+
+def match_airports(content: str) -> List[str]:
+    """지역 내용에 해당하는 공항 목록 (MAPPING_ALIASES 순서)"""
+    matched = set()
+    for m in _REGION_RE.finditer(content):
+        sub_content = m.group(2)
+        norm_sub = sub_content.replace(" ", "") if sub_content is not None else None
+        for airport, norm_lower in _ALIAS_INDEX[m.group(1)]:
+            if norm_sub is None:
+                matched.add(airport)
+            elif "제외" in norm_sub:
+                if norm_lower not in norm_sub: matched.add(airport)
+            elif norm_lower in norm_sub:
+                matched.add(airport)
+    return [airport for airport in MAPPING_ALIASES if airport in matched]
+
+
+def match_special_reports(raw_lines: Iterable[str]) -> List[Dict]:
+    """특보 문장 목록 → [{"airport": 공항, "special_report": "강풍, 대설주" 또는 "-"}]"""
+    results = {k: [] for k in MAPPING_ALIASES}
+    for line in raw_lines:
+        parsed = parse_report_line(line)
+        if parsed is None: continue
+        formatted_type, content = parsed
+        for airport in match_airports(content):
+            if formatted_type not in results[airport]:
+                results[airport].append(formatted_type)
+    return [{"airport": ap, "special_report": ", ".join(reps) if reps else "-"} for ap, reps in results.items()]
@@ -10,6 +10,13 @@ CREATE TABLE IF NOT EXISTS weather_latest (
   CONSTRAINT single_row CHECK (id = 1)
 );
 
+-- 공항별 3일 예보 (스크래퍼가 공항 단위로 upsert)
+CREATE TABLE IF NOT EXISTS airport_forecast_3day (
+  airport_code TEXT PRIMARY KEY,
+  data JSONB NOT NULL DEFAULT '[]',
+  updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
 -- 기존 히스토리용 스냅샷
 CREATE TABLE IF NOT EXISTS snapshots (
   id SERIAL PRIMARY KEY,
@@ -0,0 +1,113 @@
+"""
+히스토리 DB 델타 스냅샷 + 보존 정책 + 통계 회귀 테스트 (임시 디렉터리의 DB 사용).
+  python -m pytest -q test_history_retention.py
+"""
+import os
+import sys
+import asyncio
+import sqlite3
+import importlib
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+KST = timezone(timedelta(hours=9))
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    """database 모듈을 임시 DB에 연결 (import 시 init_db가 작업 디렉터리의 weather_history.db를 만듦)"""
+    monkeypatch.chdir(tmp_path)
+    database = importlib.import_module("database")
+    pool = database._ConnectionPool(str(tmp_path / "history.db"))
+    monkeypatch.setattr(database, "_pool", pool)
+    database.init_db()
+    return database
+
+
+def _item(code, temp, time):
+    return {"name": f"{code}공항", "code": code, "temp": temp, "time": time}
+
+
+def _save(database, items):
+    return asyncio.run(database.save_weather_snapshot(items))
+
+
+def _codes(database, snapshot_id):
+    return sorted(item["code"] for item in asyncio.run(database.get_snapshot_data(snapshot_id)))
+
+
+def test_retention_keeps_keyframe_group_straddling_cutoff(db):
+    # 23:50 키프레임, 00:10 델타(AAAA만 변경) → 자정 cutoff 이후에도 델타가 BBBB를 복원해야 함
+    keyframe = _save(db, [_item("AAAA", "1.0℃", "2026년 3월 1일(일) 23:50(KST)"),
+                          _item("BBBB", "2.0℃", "2026년 3월 1일(일) 23:50(KST)")])
+    delta = _save(db, [_item("AAAA", "1.5℃", "2026년 3월 2일(월) 00:10(KST)"),
+                       _item("BBBB", "2.0℃", "2026년 3월 1일(일) 23:50(KST)")])
+    assert keyframe != delta
+
+    summary = asyncio.run(db.run_retention(now=datetime(2026, 3, 2, 12, tzinfo=KST), raw_days=0))
+
+    assert summary["raw_cutoff"] == "2026-03-01T15:00:00Z"
+    assert summary["snapshots_deleted"] == 0
+    assert _codes(db, delta) == ["AAAA", "BBBB"]
+    assert _codes(db, keyframe) == ["AAAA", "BBBB"]
+
+
+def test_retention_prunes_whole_old_groups_once(db, monkeypatch):
+    monkeypatch.setattr(db, "HISTORY_KEYFRAME_INTERVAL", 2)
+    constant = _item("CCCC", "3.0℃", "2026년 1월 10일(토) 09:00(KST)")
+    # 스냅샷 timestamp는 첫 항목의 time
+    ids = [_save(db, [_item("DDDD", f"{hour}.0℃", f"2026년 1월 10일(토) {hour:02d}:00(KST)"), constant])
+           for hour in (10, 11, 12)]
+    recent = _save(db, [_item("DDDD", "9.0℃", "2026년 2월 10일(화) 09:00(KST)"), constant])
+
+    conn = sqlite3.connect(db._pool.path)
+    # 세 번째 스냅샷은 키프레임이라 CCCC를 다시 저장하지만 inherited 로 표시됨
+    assert conn.execute(
+        "SELECT COUNT(*) FROM weather_data WHERE airport_code = 'CCCC' AND NOT inherited"
+    ).fetchone()[0] == 1
+
+    summary = asyncio.run(db.run_retention(now=datetime(2026, 2, 1, tzinfo=KST), raw_days=0))
+
+    # 그룹: [1, 2] 전부 cutoff 이전 → 삭제, [3(키프레임), 4] 는 cutoff에 걸쳐 원본 유지
+    assert summary["snapshots_deleted"] == 2
+    samples = dict(conn.execute("SELECT airport_code, samples FROM weather_daily").fetchall())
+    assert samples == {"CCCC": 1, "DDDD": 2}
+    assert _codes(db, ids[2]) == ["CCCC", "DDDD"]
+    assert _codes(db, recent) == ["CCCC", "DDDD"]
+    conn.close()
+
+
+def test_incremental_vacuum_frees_all_requested_pages(db):
+    retention = importlib.import_module("retention")
+    for hour in range(10, 20):
+        _save(db, [dict(_item("EEEE", f"{hour}.0℃", f"2026년 1월 10일(토) {hour:02d}:00(KST)"),
+                        memo=os.urandom(4000).hex())])
+    conn = sqlite3.connect(db._pool.path, isolation_level=None)
+    assert conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+    conn.execute("DELETE FROM weather_data")
+    free = conn.execute("PRAGMA freelist_count").fetchone()[0]
+    assert free > 3
+
+    assert retention._vacuum(conn, 2) == "incremental vacuum (2 pages)"
+    assert conn.execute("PRAGMA freelist_count").fetchone()[0] == free - 2
+    assert retention._vacuum(conn, 0) == f"incremental vacuum ({free - 2} pages)"
+    assert conn.execute("PRAGMA freelist_count").fetchone()[0] == 0
+    conn.close()
+
+
+def test_history_stats_conditions_ignore_feels_like_text(db):
+    # 프론트엔드 저장 항목: current.condition 이 체감온도 문자열 → iconCode 범주(맑음)로 집계
+    frontend = {"airportName": "인천", "icao": "RKSI", "timestamp": "2026-01-29T22:00:00+09:00",
+                "current": {"condition": "체감(-10.0℃)", "temperature": "-6.5℃", "iconCode": "sunny"}}
+    _save(db, [frontend])
+    _save(db, [dict(frontend, timestamp="2026-01-29T23:00:00+09:00",
+                    current={"condition": "체감(-6.4℃)", "temperature": "-3.0℃"})])
+
+    stats = asyncio.run(db.get_history_stats(bucket="day", airports=["RKSI"]))
+
+    assert [(row["bucket"], row["samples"]) for row in stats] == [("2026-01-29", 2)]
+    # 아이콘이 없는 항목은 범주 없음 (None)
+    assert stats[0]["conditions"] == {"맑음": 1}
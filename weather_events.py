@@ -0,0 +1,136 @@
+"""
+기상 데이터 변경 푸시 (Server-Sent Events).
+- 접속 시 전체 스냅샷 1회, 이후 갱신될 때마다 바뀐 공항만 delta 이벤트로 전송
+- 변경이 없으면 아무것도 보내지 않고, 일정 간격으로 heartbeat 주석만 전송
+- 이벤트 id("<부팅 id>-<순번>")와 최근 이벤트 버퍼로 Last-Event-ID 재접속 시 놓친 이벤트만 재전송
+  (버퍼를 벗어났거나 서버가 재시작됐으면 스냅샷부터 다시)
+"""
+import os
+import json
+import time
+import asyncio
+import logging
+import secrets
+from collections import deque
+from typing import AsyncIterator, Dict, List, Optional
+
+from metrics import metrics
+
+logger = logging.getLogger("weather_events")
+
+WEATHER_STREAM_HEARTBEAT_SECONDS = float(os.getenv("WEATHER_STREAM_HEARTBEAT_SECONDS", "15"))
+# 재접속 시 재전송할 수 있도록 보관하는 최근 이벤트 수
+WEATHER_STREAM_BACKLOG = int(os.getenv("WEATHER_STREAM_BACKLOG", "256"))
+# 느린 구독자의 대기 이벤트가 이 수를 넘으면 끊고 스냅샷부터 다시 받게 함
+WEATHER_STREAM_QUEUE_SIZE = int(os.getenv("WEATHER_STREAM_QUEUE_SIZE", "64"))
+
+metrics.describe("weather_stream_subscribers", "Connected /api/weather/stream clients")
+metrics.describe("weather_stream_events_total", "Weather stream events published by type")
+
+
+def _format_event(event_id: str, event: str, payload: Dict) -> str:
+    data = json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
+    return f"id: {event_id}\nevent: {event}\ndata: {data}\n\n"
+
+
+def diff_airports(previous: List[Dict], current: List[Dict]) -> Dict:
+    """공항 코드 기준 비교 → {"changed": [바뀐/새 항목], "removed": [사라진 코드]}"""
+    before = {item.get("code"): item for item in previous or []}
+    after = {item.get("code"): item for item in current or []}
+    changed = [item for code, item in after.items() if before.get(code) != item]
+    removed = [code for code in before if code not in after]
+    return {"changed": changed, "removed": removed}
+
+
+class WeatherEventBus:
+    def __init__(self, backlog: int = WEATHER_STREAM_BACKLOG):
+        # 같은 초에 뜬 워커(다중 프로세스)끼리 겹치지 않도록 난수 추가 ("-"는 이벤트 id 구분자라 쓰지 않음)
+        self.boot_id = f"{int(time.time())}.{secrets.token_hex(4)}"
+        self.seq = 0
+        self.data: Optional[List[Dict]] = None
+        self.last_updated: Optional[str] = None
+        self._backlog: deque = deque(maxlen=backlog)   # (seq, SSE 문자열)
+        self._subscribers: set = set()
+
+    @property
+    def last_event_id(self) -> str:
+        return f"{self.boot_id}-{self.seq}"
+
+    def publish(self, data: List[Dict], last_updated: Optional[str]) -> bool:
+        """새 데이터 반영. 바뀐 공항이 있으면 delta 이벤트를 보내고 True."""
+        if self.data is None:
+            delta = {"changed": list(data), "removed": []}
+        else:
+            delta = diff_airports(self.data, data)
+        self.data = data
+        self.last_updated = last_updated
+        if not delta["changed"] and not delta["removed"]:
+            return False
+
+        self.seq += 1
+        message = _format_event(self.last_event_id, "delta", dict(delta, last_updated=last_updated))
+        self._backlog.append((self.seq, message))
+        metrics.inc("weather_stream_events_total", type="delta")
+        for queue in list(self._subscribers):
+            try:
+                queue.put_nowait(message)
+            except asyncio.QueueFull:
+                # 따라오지 못하는 구독자는 끊음 → 클라이언트가 재접속해 스냅샷/재전송을 받음
+                self._subscribers.discard(queue)
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(None)
+                logger.warning("Dropping slow weather stream subscriber")
+        return True
+
+    def _snapshot(self) -> str:
+        metrics.inc("weather_stream_events_total", type="snapshot")
+        return _format_event(
+            self.last_event_id, "snapshot",
+            {"data": self.data or [], "last_updated": self.last_updated},
+        )
+
+    def _replay(self, last_event_id: Optional[str]) -> Optional[List[str]]:
+        """Last-Event-ID 이후 이벤트 목록. 재전송할 수 없으면 None (스냅샷 필요)."""
+        if not last_event_id:
+            return None
+        boot_id, _, seq = last_event_id.partition("-")
+        if boot_id != self.boot_id or not seq.isdigit():
+            return None
+        seq = int(seq)
+        if seq > self.seq:
+            return None
+        if seq == self.seq:
+            return []
+        if not self._backlog or self._backlog[0][0] > seq + 1:
+            return None
+        return [message for s, message in self._backlog if s > seq]
+
+    async def subscribe(self, last_event_id: Optional[str] = None,
+                        heartbeat: float = WEATHER_STREAM_HEARTBEAT_SECONDS) -> AsyncIterator[str]:
+        """SSE 문자열을 순서대로 내보내는 async generator. 연결이 끊기면 정리됩니다."""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=WEATHER_STREAM_QUEUE_SIZE)
+        # 구독 등록과 초기 이벤트 계산 사이에 await가 없어 이벤트가 빠지거나 겹치지 않음
+        self._subscribers.add(queue)
+        replay = self._replay(last_event_id)
+        initial = replay if replay is not None else ([self._snapshot()] if self.data is not None else [])
+        metrics.set_gauge("weather_stream_subscribers", len(self._subscribers))
+        try:
+            yield "retry: 5000\n\n"
+            for message in initial:
+                yield message
+            while True:
+                try:
+                    message = await asyncio.wait_for(queue.get(), timeout=heartbeat)
+                except asyncio.TimeoutError:
+                    yield ": heartbeat\n\n"
+                    continue
+                if message is None:
+                    return
+                yield message
+        finally:
+            self._subscribers.discard(queue)
+            metrics.set_gauge("weather_stream_subscribers", len(self._subscribers))
+
+
+weather_events = WeatherEventBus()